@@ -3,10 +3,11 @@
 
 echo "🚀 Starting AI CLI Memory Dashboard..."
 
-# Check if flask is installed
-if ! python3 -c "import flask" 2>/dev/null; then
+# Check if flask and Flask-Caching are installed
+if ! python3 -c "import flask, flask_caching" 2>/dev/null; then
     echo "📦 Installing dependencies..."
-    brew install python-flask 2>/dev/null || pipx install flask
+    python3 -c "import flask" 2>/dev/null || brew install python-flask 2>/dev/null || pipx install flask
+    pip3 install --user Flask-Caching
 fi
 
 # Launch dashboard
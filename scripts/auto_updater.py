@@ -6,78 +6,158 @@ Automatically checks and updates Claude Code, Codex, Gemini, and other CLI tools
 
 import os
 import sys
-import json
+import shlex
+import argparse
+import shutil
+import atexit
+import asyncio
+import threading
 import subprocess
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import Awaitable, Callable, Dict, Optional, List
+
+try:
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
+
+
+def _last_word(output: str) -> str:
+    """Take the last word of a `--version` output"""
+    return output.strip().split()[-1]
+
+
+# `--version` command per tool, with a parser for its output
+VERSION_COMMANDS: Dict[str, tuple] = {
+    # Output like "Claude Code v2.1.1"
+    "claude": (["claude", "--version"], lambda out: out.strip().split('\n')[0].split()[-1].lstrip('v')),
+    # GitHub Copilot CLI
+    "codex": (["gh", "copilot", "--version"], _last_word),
+    # Gemini CLI (via gcloud or direct install)
+    "gemini": (["gemini", "--version"], _last_word),
+    # Cursor IDE CLI
+    "cursor": (["cursor", "--version"], str.strip),
+    "aider": (["aider", "--version"], _last_word),
+}
+
+# PyPI package behind each pip-installed tool
+PIP_PACKAGES = {
+    "gemini": "google-generativeai",
+    "aider": "aider-chat",
+}
 
 class CLIUpdater:
     def __init__(self, db_path: Optional[str] = None):
         if db_path is None:
             db_path = os.path.expanduser("~/.claude/memory/context.db")
         self.db_path = db_path
-
-    def get_installed_version(self, tool: str) -> Optional[str]:
-        """Get currently installed version of a tool"""
+        self._pip_outdated_task = None
+        self._conn = None
+        self._path_cache: Dict[str, Optional[str]] = {}
+        self._print_lock = threading.Lock()
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """Get the shared database connection, opening it on first use"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+            self._conn.executescript("""
+                PRAGMA journal_mode=WAL;
+                PRAGMA synchronous=NORMAL;
+                PRAGMA temp_store=MEMORY;
+            """)
+            atexit.register(self._conn.close)
+
+            # Databases created before install_mtime_ns was added to the schema
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(cli_versions)")}
+            if columns and "install_mtime_ns" not in columns:
+                self._conn.execute("ALTER TABLE cli_versions ADD COLUMN install_mtime_ns INTEGER")
+        return self._conn
+
+    def _get_install_mtime_ns(self, tool: str) -> Optional[int]:
+        """Get the mtime of a tool's binary, or None if it isn't on PATH
+
+        Also None when the version comes from a shared launcher (codex -> `gh copilot`):
+        upgrading the extension leaves that binary untouched, so its mtime can't key the cache.
+        """
+        if tool in VERSION_COMMANDS and VERSION_COMMANDS[tool][0][0] != tool:
+            return None
+        path = self.get_install_path(tool)
+        if path is None:
+            return None
         try:
-            if tool == "claude":
-                result = subprocess.run(
-                    ["claude", "--version"],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                if result.returncode == 0:
-                    # Extract version from output like "Claude Code v2.1.1"
-                    version_line = result.stdout.strip().split('\n')[0]
-                    version = version_line.split()[-1].lstrip('v')
-                    return version
-
-            elif tool == "codex":
-                # GitHub Copilot CLI
-                result = subprocess.run(
-                    ["gh", "copilot", "--version"],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                if result.returncode == 0:
-                    return result.stdout.strip().split()[-1]
-
-            elif tool == "gemini":
-                # Gemini CLI (via gcloud or direct install)
-                result = subprocess.run(
-                    ["gemini", "--version"],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                if result.returncode == 0:
-                    return result.stdout.strip().split()[-1]
-
-            elif tool == "cursor":
-                # Cursor IDE CLI
-                result = subprocess.run(
-                    ["cursor", "--version"],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                if result.returncode == 0:
-                    return result.stdout.strip()
-
-            elif tool == "aider":
-                result = subprocess.run(
-                    ["aider", "--version"],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                if result.returncode == 0:
-                    return result.stdout.strip().split()[-1]
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    async def _run(self, cmd: List[str], timeout: float, text: bool = True) -> subprocess.CompletedProcess:
+        """Run a command without blocking the event loop
 
+        With text=False stdout/stderr are left as bytes (e.g. for JSON parsing).
+        """
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise subprocess.TimeoutExpired(cmd, timeout)
+
+        if text:
+            stdout, stderr = stdout.decode(), stderr.decode()
+        return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+
+    async def get_installed_version(self, tool: str) -> Optional[str]:
+        """Get currently installed version of a tool
+
+        Reuses the recorded version while the binary's mtime is unchanged, so
+        only new or updated installs pay for a `--version` run.
+        """
+        mtime_ns = self._get_install_mtime_ns(tool)
+        if mtime_ns is not None:
+            # The cache is optional: a missing database or schema is just a miss
+            try:
+                row = self._get_conn().execute("""
+                    SELECT version, install_mtime_ns FROM cli_versions
+                    WHERE tool_name = ?
+                """, (tool,)).fetchone()
+            except sqlite3.Error:
+                row = None
+            if row is not None and row[1] == mtime_ns:
+                return row[0]
+
+        version = await self._probe_installed_version(tool)
+
+        if version is not None and mtime_ns is not None:
+            try:
+                self._get_conn().execute("""
+                    INSERT INTO cli_versions (tool_name, version, install_path, install_mtime_ns)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(tool_name) DO UPDATE SET
+                        version = excluded.version,
+                        install_path = excluded.install_path,
+                        install_mtime_ns = excluded.install_mtime_ns
+                """, (tool, version, self.get_install_path(tool), mtime_ns))
+            except sqlite3.Error:
+                pass
+
+        return version
+
+    async def _probe_installed_version(self, tool: str) -> Optional[str]:
+        """Run the tool to read its installed version"""
+        if tool not in VERSION_COMMANDS:
+            return None
+        cmd, parse = VERSION_COMMANDS[tool]
+        try:
+            result = await self._run(cmd, timeout=5)
+            if result.returncode == 0:
+                return parse(result.stdout)
         except (subprocess.TimeoutExpired, FileNotFoundError, Exception) as e:
             return None
 
@@ -85,22 +165,26 @@ class CLIUpdater:
 
     def get_install_path(self, tool: str) -> Optional[str]:
         """Get installation path for a tool"""
-        try:
-            result = subprocess.run(
-                ["which", tool],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if result.returncode == 0:
-                return result.stdout.strip()
-        except:
-            pass
-        return None
-
-    def check_for_updates(self, tool: str) -> Dict[str, any]:
+        if tool not in self._path_cache:
+            self._path_cache[tool] = shutil.which(tool)
+        return self._path_cache[tool]
+
+    async def _fetch_pip_outdated(self) -> Dict[str, Dict]:
+        """Run `pip3 list --outdated` and index the packages by name"""
+        pip_result = await self._run(["pip3", "list", "--outdated", "--format=json"], timeout=10, text=False)
+        if pip_result.returncode != 0 or not pip_result.stdout:
+            return {}
+        return {package["name"]: package for package in _loads(pip_result.stdout)}
+
+    async def _pip_outdated(self) -> Dict[str, Dict]:
+        """Outdated pip packages, fetched once and shared by every pip-backed tool"""
+        if self._pip_outdated_task is None:
+            self._pip_outdated_task = asyncio.ensure_future(self._fetch_pip_outdated())
+        return await self._pip_outdated_task
+
+    async def check_for_updates(self, tool: str) -> Dict[str, any]:
         """Check if updates are available for a tool"""
-        current_version = self.get_installed_version(tool)
+        current_version = await self.get_installed_version(tool)
         install_path = self.get_install_path(tool)
 
         result = {
@@ -117,184 +201,228 @@ class CLIUpdater:
             return result
 
         # Check for updates based on tool type
-        try:
-            if tool == "claude":
-                # Check npm for updates
-                npm_result = subprocess.run(
-                    ["npm", "outdated", "-g", "@anthropic-ai/claude-code", "--json"],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                if npm_result.stdout:
-                    outdated = json.loads(npm_result.stdout)
-                    if "@anthropic-ai/claude-code" in outdated:
-                        result["latest_version"] = outdated["@anthropic-ai/claude-code"]["latest"]
-                        result["update_available"] = True
-                        result["update_command"] = "npm update -g @anthropic-ai/claude-code"
-
-            elif tool == "codex":
-                # Check GitHub CLI extensions
-                gh_result = subprocess.run(
-                    ["gh", "extension", "list"],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                if "copilot" in gh_result.stdout:
-                    # Check for extension updates
-                    update_result = subprocess.run(
-                        ["gh", "extension", "upgrade", "--dry-run", "copilot"],
-                        capture_output=True,
-                        text=True,
-                        timeout=10
-                    )
-                    if "already up to date" not in update_result.stdout.lower():
-                        result["update_available"] = True
-                        result["update_command"] = "gh extension upgrade copilot"
-
-            elif tool == "gemini":
-                # Check pip for updates
-                pip_result = subprocess.run(
-                    ["pip3", "list", "--outdated", "--format=json"],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                if pip_result.returncode == 0:
-                    outdated = json.loads(pip_result.stdout)
-                    for package in outdated:
-                        if package["name"] == "google-generativeai":
-                            result["latest_version"] = package["latest_version"]
-                            result["update_available"] = True
-                            result["update_command"] = "pip3 install --upgrade google-generativeai"
-
-            elif tool == "aider":
-                pip_result = subprocess.run(
-                    ["pip3", "list", "--outdated", "--format=json"],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                if pip_result.returncode == 0:
-                    outdated = json.loads(pip_result.stdout)
-                    for package in outdated:
-                        if package["name"] == "aider-chat":
-                            result["latest_version"] = package["latest_version"]
-                            result["update_available"] = True
-                            result["update_command"] = "pip3 install --upgrade aider-chat"
-
-        except Exception as e:
-            result["error"] = str(e)
+        probe = self.PROBES.get(tool)
+        if probe is not None:
+            try:
+                await probe(self, result)
+            except Exception as e:
+                result["error"] = str(e)
 
         return result
 
-    def update_tool(self, tool: str, auto_confirm: bool = False) -> bool:
-        """Update a specific tool"""
-        update_info = self.check_for_updates(tool)
-
-        if not update_info["update_available"]:
-            print(f"✓ {tool} is already up to date ({update_info['current_version']})")
-            return True
-
-        print(f"🔄 Update available for {tool}:")
-        print(f"   Current: {update_info['current_version']}")
-        print(f"   Latest: {update_info['latest_version']}")
-        print(f"   Command: {update_info['update_command']}")
-
-        if not auto_confirm:
-            response = input("   Update now? [Y/n]: ").strip().lower()
-            if response and response != 'y':
-                print("   Skipped")
-                return False
-
-        print(f"   Updating {tool}...")
+    async def _probe_claude(self, result: Dict[str, any]):
+        """Check npm for a newer Claude Code"""
+        npm_result = await self._run(["npm", "outdated", "-g", "@anthropic-ai/claude-code", "--json"], timeout=10, text=False)
+        if npm_result.stdout:
+            outdated = _loads(npm_result.stdout)
+            if "@anthropic-ai/claude-code" in outdated:
+                result["latest_version"] = outdated["@anthropic-ai/claude-code"]["latest"]
+                result["update_available"] = True
+                result["update_command"] = ("npm", "update", "-g", "@anthropic-ai/claude-code")
+
+    async def _probe_codex(self, result: Dict[str, any]):
+        """Check GitHub CLI extensions for a newer Copilot"""
+        gh_result = await self._run(["gh", "extension", "list"], timeout=10)
+        if "copilot" in gh_result.stdout:
+            # Check for extension updates
+            update_result = await self._run(["gh", "extension", "upgrade", "--dry-run", "copilot"], timeout=10)
+            if "already up to date" not in update_result.stdout.lower():
+                result["update_available"] = True
+                result["update_command"] = ("gh", "extension", "upgrade", "copilot")
+
+    async def _probe_pip(self, result: Dict[str, any]):
+        """Check pip for a newer version of the tool's package"""
+        package_name = PIP_PACKAGES[result["tool"]]
+        package = (await self._pip_outdated()).get(package_name)
+        if package:
+            result["latest_version"] = package["latest_version"]
+            result["update_available"] = True
+            result["update_command"] = ("pip3", "install", "--upgrade", package_name)
+
+    # Update check per tool; tools without an entry are only version-probed
+    PROBES: Dict[str, Callable[["CLIUpdater", Dict[str, any]], Awaitable[None]]] = {
+        "claude": _probe_claude,
+        "codex": _probe_codex,
+        "gemini": _probe_pip,
+        "aider": _probe_pip,
+    }
+
+    def _print(self, *lines: str):
+        """Print lines as one block, so parallel updates don't interleave"""
+        with self._print_lock:
+            print("\n".join(lines))
+
+    def _print_update_available(self, tool: str, update_info: Dict[str, any]):
+        """Show what an update would change"""
+        self._print(
+            f"🔄 Update available for {tool}:",
+            f"   Current: {update_info['current_version']}",
+            f"   Latest: {update_info['latest_version']}",
+            f"   Command: {shlex.join(update_info['update_command'])}"
+        )
+
+    def _install_update(self, tool: str, update_info: Dict[str, any]) -> bool:
+        """Run a tool's update command (safe to call from worker threads)"""
+        self._print(f"   Updating {tool}...")
 
         try:
             result = subprocess.run(
                 update_info['update_command'],
-                shell=True,
+                shell=False,
                 capture_output=True,
                 text=True,
                 timeout=300  # 5 minutes timeout
             )
 
             if result.returncode == 0:
-                print(f"✓ {tool} updated successfully!")
-                self.record_update(tool, update_info['current_version'], update_info['latest_version'])
+                self._print(f"✓ {tool} updated successfully!")
                 return True
             else:
-                print(f"✗ Failed to update {tool}")
-                print(f"   Error: {result.stderr}")
+                self._print(f"✗ Failed to update {tool}", f"   Error: {result.stderr}")
                 return False
 
         except Exception as e:
-            print(f"✗ Error updating {tool}: {e}")
+            self._print(f"✗ Error updating {tool}: {e}")
             return False
 
-    def record_update(self, tool: str, old_version: str, new_version: str):
-        """Record update in database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            INSERT INTO cli_versions (tool_name, version, install_path, last_check, update_available, latest_version, updated_at)
-            VALUES (?, ?, ?, ?, 0, ?, ?)
-            ON CONFLICT(tool_name) DO UPDATE SET
-                version = excluded.version,
-                last_check = excluded.last_check,
-                update_available = 0,
-                latest_version = excluded.latest_version,
-                updated_at = excluded.updated_at
-        """, (
-            tool,
-            new_version,
-            self.get_install_path(tool),
-            datetime.now().isoformat(),
-            new_version,
-            datetime.now().isoformat()
-        ))
-
-        conn.commit()
-        conn.close()
+    def update_tool(self, tool: str, auto_confirm: bool = False) -> bool:
+        """Update a specific tool"""
+        update_info = asyncio.run(self.check_for_updates(tool))
 
-    def should_check_updates(self, tool: str) -> bool:
-        """Check if we should check for updates (don't check too frequently)"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        if not update_info["update_available"]:
+            print(f"✓ {tool} is already up to date ({update_info['current_version']})")
+            return True
+
+        self._print_update_available(tool, update_info)
 
-        cursor.execute("""
-            SELECT last_check FROM cli_versions
-            WHERE tool_name = ?
-        """, (tool,))
+        if not auto_confirm:
+            response = input("   Update now? [Y/n]: ").strip().lower()
+            if response and response != 'y':
+                print("   Skipped")
+                return False
 
-        row = cursor.fetchone()
-        conn.close()
+        if not self._install_update(tool, update_info):
+            return False
 
-        if row is None:
-            return True
+        self.record_update(tool, update_info['current_version'], update_info['latest_version'])
+        return True
+
+    def record_update(self, tool: str, old_version: str, new_version: str):
+        """Record update in database"""
+        self.record_updates([(tool, new_version)])
+
+    def record_updates(self, updates: List[tuple]):
+        """Record several (tool, new_version) updates in one write transaction
+
+        Each tool is re-probed, and the version it actually reports is stored along
+        with its binary's mtime. If the probe fails, the expected new_version is stored
+        with no mtime, so the next get_installed_version() probes again instead of
+        trusting it. Tools with neither are skipped: cli_versions.version is NOT NULL
+        and one bad row would roll back the rest.
+        """
+        async def probe_all() -> List[Optional[str]]:
+            return await asyncio.gather(*(self._probe_installed_version(tool) for tool, _ in updates))
+
+        installed = asyncio.run(probe_all()) if updates else []
+
+        now = datetime.now().isoformat()
+        rows = []
+        for (tool, new_version), version in zip(updates, installed):
+            if version is not None:
+                mtime_ns = self._get_install_mtime_ns(tool)
+                if new_version is not None and version != new_version:
+                    print(f"⚠️  {tool} reports {version} after updating (expected {new_version})")
+            elif new_version is not None:
+                version, mtime_ns = new_version, None
+            else:
+                continue
+            rows.append((tool, version, self.get_install_path(tool), now,
+                         new_version if new_version is not None else version, mtime_ns, now))
+
+        if not rows:
+            return
 
-        last_check = datetime.fromisoformat(row[0])
+        conn = self._get_conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("""
+                INSERT INTO cli_versions (tool_name, version, install_path, last_check, update_available, latest_version, install_mtime_ns, updated_at)
+                VALUES (?, ?, ?, ?, 0, ?, ?, ?)
+                ON CONFLICT(tool_name) DO UPDATE SET
+                    version = excluded.version,
+                    install_path = excluded.install_path,
+                    last_check = excluded.last_check,
+                    update_available = 0,
+                    latest_version = excluded.latest_version,
+                    install_mtime_ns = excluded.install_mtime_ns,
+                    updated_at = excluded.updated_at
+            """, rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _last_checks(self, tools: List[str]) -> Dict[str, datetime]:
+        """Get the last check time of each tool in a single query"""
+        placeholders = ','.join('?' * len(tools))
+        rows = self._get_conn().execute(f"""
+            SELECT tool_name, last_check FROM cli_versions
+            WHERE tool_name IN ({placeholders}) AND last_check IS NOT NULL
+        """, tools).fetchall()
+
+        return {tool: datetime.fromisoformat(last_check) for tool, last_check in rows}
+
+    def _stale_tools(self, tools: List[str]) -> List[str]:
+        """Filter tools down to the ones due for an update check"""
+        last_checks = self._last_checks(tools)
+        now = datetime.now()
         # Check at most once per day
-        return datetime.now() - last_check > timedelta(hours=24)
+        return [tool for tool in tools if now - last_checks.get(tool, datetime.min) > timedelta(hours=24)]
+
+    def should_check_updates(self, tool: str) -> bool:
+        """Check if we should check for updates (don't check too frequently)"""
+        return bool(self._stale_tools([tool]))
 
-    def check_all_tools(self, tools: Optional[List[str]] = None) -> Dict[str, Dict]:
-        """Check all tools for updates"""
+    async def check_all_tools(self, tools: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """Check all tools for updates, probing them concurrently"""
         if tools is None:
             tools = ["claude", "codex", "gemini", "aider", "cursor"]
 
+        # Refresh the shared pip listing on every full check
+        self._pip_outdated_task = None
+        semaphore = asyncio.Semaphore(8)
+
+        async def check(tool: str) -> Dict[str, any]:
+            async with semaphore:
+                return await self.check_for_updates(tool)
+
+        # Insert every tool up front so results keep the requested order
         results = {}
+        tasks = {}
+
+        stale = set(self._stale_tools(tools))
 
         for tool in tools:
-            if self.should_check_updates(tool):
+            if tool in stale:
                 print(f"Checking {tool}...")
-                results[tool] = self.check_for_updates(tool)
+                results[tool] = None
+                tasks[tool] = asyncio.create_task(check(tool))
             else:
                 print(f"Skipping {tool} (checked recently)")
                 results[tool] = {"skipped": True}
 
+        checked = await asyncio.gather(*tasks.values())
+        results.update(zip(tasks.keys(), checked))
+
         return results
 
+    async def get_status(self, tools: List[str]) -> List[tuple]:
+        """Get (tool, version, path) for each tool, probing them concurrently"""
+        async def probe(tool: str) -> tuple:
+            return tool, await self.get_installed_version(tool), self.get_install_path(tool)
+
+        return await asyncio.gather(*(probe(tool) for tool in tools))
+
     def update_all_tools(self, tools: Optional[List[str]] = None, auto_confirm: bool = False):
         """Update all tools that have updates available"""
         if tools is None:
@@ -302,78 +430,121 @@ class CLIUpdater:
 
         print("🔍 Checking for updates...\n")
 
-        for tool in tools:
-            if self.should_check_updates(tool):
+        stale = self._stale_tools(tools)
+
+        # Interactive prompts can't be multiplexed, so only -y runs in parallel
+        if not auto_confirm:
+            for tool in stale:
                 self.update_tool(tool, auto_confirm)
                 print()
+            return
 
+        async def check_stale() -> List[Dict[str, any]]:
+            return await asyncio.gather(*(self.check_for_updates(tool) for tool in stale))
 
-def main():
-    """CLI interface for auto-updater"""
-    updater = CLIUpdater()
+        pending = []
+        for update_info in asyncio.run(check_stale()):
+            if update_info["update_available"]:
+                self._print_update_available(update_info["tool"], update_info)
+                pending.append(update_info)
+            else:
+                print(f"✓ {update_info['tool']} is already up to date ({update_info['current_version']})")
+
+        # npm, pip and gh write to separate prefixes, so their updates can overlap
+        updated = []
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = {
+                executor.submit(self._install_update, update_info["tool"], update_info): update_info
+                for update_info in pending
+            }
+            for future in as_completed(futures):
+                update_info = futures[future]
+                if future.result():
+                    updated.append((update_info["tool"], update_info["latest_version"]))
+
+        self.record_updates(updated)
+
+
+def _check(updater: CLIUpdater, args: argparse.Namespace):
+    """`check` command: report which tools have updates"""
+    results = asyncio.run(updater.check_all_tools(args.tools or None))
+
+    print("\n📊 Update Status:")
+    for tool, info in results.items():
+        if info.get("skipped"):
+            continue
+
+        status = "✗" if not info["installed"] else "✓"
+        print(f"\n{status} {tool}:")
+
+        if info["installed"]:
+            print(f"   Version: {info['current_version']}")
+            if info["update_available"]:
+                print(f"   ⬆️  Update available: {info['latest_version']}")
+            else:
+                print(f"   ✓ Up to date")
+        else:
+            print(f"   Not installed")
 
-    if len(sys.argv) < 2:
-        print("AI CLI Auto-Updater")
-        print("\nUsage: auto_updater.py <command> [options]")
-        print("\nCommands:")
-        print("  check [tool...]        - Check for updates")
-        print("  update [tool...]       - Update specific tool(s)")
-        print("  update-all [-y]        - Update all tools (-y for auto-confirm)")
-        print("  status                 - Show current versions")
-        print("\nSupported tools: claude, codex, gemini, aider, cursor")
-        sys.exit(1)
 
-    command = sys.argv[1]
+def _update(updater: CLIUpdater, args: argparse.Namespace):
+    """`update` command: update the named tools"""
+    for tool in args.tools:
+        updater.update_tool(tool)
 
-    if command == "check":
-        tools = sys.argv[2:] if len(sys.argv) > 2 else None
-        results = updater.check_all_tools(tools)
 
-        print("\n📊 Update Status:")
-        for tool, info in results.items():
-            if info.get("skipped"):
-                continue
+def _update_all(updater: CLIUpdater, args: argparse.Namespace):
+    """`update-all` command"""
+    updater.update_all_tools(auto_confirm=args.yes)
 
-            status = "✗" if not info["installed"] else "✓"
-            print(f"\n{status} {tool}:")
 
-            if info["installed"]:
-                print(f"   Version: {info['current_version']}")
-                if info["update_available"]:
-                    print(f"   ⬆️  Update available: {info['latest_version']}")
-                else:
-                    print(f"   ✓ Up to date")
-            else:
-                print(f"   Not installed")
+def _status(updater: CLIUpdater, args: argparse.Namespace):
+    """`status` command: show installed versions"""
+    tools = ["claude", "codex", "gemini", "aider", "cursor"]
+    print("📋 Installed AI CLI Tools:\n")
 
-    elif command == "update":
-        if len(sys.argv) < 3:
-            print("Error: Please specify tool(s) to update")
-            sys.exit(1)
+    for tool, version, path in asyncio.run(updater.get_status(tools)):
+        if version:
+            print(f"✓ {tool:12} v{version}")
+            print(f"  {path}")
+        else:
+            print(f"✗ {tool:12} Not installed")
+        print()
 
-        tools = sys.argv[2:]
-        for tool in tools:
-            updater.update_tool(tool)
 
-    elif command == "update-all":
-        auto_confirm = "-y" in sys.argv or "--yes" in sys.argv
-        updater.update_all_tools(auto_confirm=auto_confirm)
+def main():
+    """CLI interface for auto-updater"""
+    parser = argparse.ArgumentParser(
+        prog="auto_updater.py",
+        description="AI CLI Auto-Updater",
+        epilog="Supported tools: claude, codex, gemini, aider, cursor"
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="<command>")
 
-    elif command == "status":
-        tools = ["claude", "codex", "gemini", "aider", "cursor"]
-        print("📋 Installed AI CLI Tools:\n")
+    check_parser = subparsers.add_parser("check", help="Check for updates")
+    check_parser.add_argument("tools", nargs="*", metavar="tool")
 
-        for tool in tools:
-            version = updater.get_installed_version(tool)
-            path = updater.get_install_path(tool)
+    update_parser = subparsers.add_parser("update", help="Update specific tool(s)")
+    update_parser.add_argument("tools", nargs="+", metavar="tool")
 
-            if version:
-                print(f"✓ {tool:12} v{version}")
-                print(f"  {path}")
-            else:
-                print(f"✗ {tool:12} Not installed")
-            print()
+    update_all_parser = subparsers.add_parser("update-all", help="Update all tools")
+    update_all_parser.add_argument("-y", "--yes", action="store_true", help="Auto-confirm updates")
+
+    subparsers.add_parser("status", help="Show current versions")
+
+    args = parser.parse_args()
+    if args.command is None:
+        parser.print_help()
+        sys.exit(1)
+
+    updater = CLIUpdater()
 
+    {
+        "check": _check,
+        "update": _update,
+        "update-all": _update_all,
+        "status": _status,
+    }[args.command](updater, args)
 
 if __name__ == "__main__":
     main()
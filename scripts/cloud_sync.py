@@ -6,14 +6,65 @@ Sync your memory across machines using AWS S3, Google Drive, or Dropbox
 
 import os
 import sys
+import copy
 import json
+import argparse
 import sqlite3
 import hashlib
-import boto3
+import mmap
+import functools
 from datetime import datetime
 from pathlib import Path
 import subprocess
 
+
+@functools.lru_cache(maxsize=None)
+def _zstandard():
+    """Import the optional zstandard module on first use (None if not installed)"""
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def _sqlite_copy(src_path, dst_path):
+    """Copy the database at src_path into dst_path with SQLite's backup API
+
+    Unlike a file copy this includes commits still in src's -wal file, and since
+    the copy is written through a connection to dst_path, any -wal/-shm beside
+    dst_path stay consistent with it. Returns the number of pages copied.
+    """
+    src = sqlite3.connect(Path(src_path).absolute().as_uri() + "?mode=ro", uri=True)
+    dst = sqlite3.connect(dst_path)
+    try:
+        src.backup(dst)
+        return src.execute("PRAGMA page_count").fetchone()[0]
+    finally:
+        dst.close()
+        src.close()
+
+
+def _sqlite_export(src_path, dst_path):
+    """Write a consistent copy of the database at src_path to dst_path, replacing it atomically"""
+    tmp_path = dst_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        page_count = _sqlite_copy(src_path, tmp_path)
+        # A standalone copy shouldn't make readers create -wal/-shm files next to it
+        conn = sqlite3.connect(tmp_path)
+        try:
+            conn.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            conn.close()
+        os.replace(tmp_path, dst_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return page_count
+
+
 class CloudSync:
     def __init__(self, db_path=None, sync_method='s3'):
         if db_path is None:
@@ -22,13 +73,19 @@ class CloudSync:
         self.db_path = db_path
         self.sync_method = sync_method
         self.config_path = os.path.expanduser("~/.claude/memory/sync_config.json")
+        self._s3 = None
+        self._s3_transfer_config = None
+        self._machine_id = None
         self.load_config()
 
     def load_config(self):
         """Load sync configuration"""
+        self._saved_config = None
+
         if os.path.exists(self.config_path):
             with open(self.config_path, 'r') as f:
                 self.config = json.load(f)
+            self._saved_config = copy.deepcopy(self.config)
         else:
             self.config = {
                 "sync_enabled": False,
@@ -41,70 +98,188 @@ class CloudSync:
             self.save_config()
 
     def save_config(self):
-        """Save sync configuration"""
+        """Save sync configuration (skipped when nothing changed since it was last read or written)"""
+        if self.config == self._saved_config:
+            return
+
         os.makedirs(os.path.dirname(self.config_path), exist_ok=True)
-        with open(self.config_path, 'w') as f:
-            json.dump(self.config, f, indent=2)
+        with open(self.config_path, 'w', buffering=1 << 14, encoding='utf-8') as f:
+            f.write(json.dumps(self.config, indent=2, ensure_ascii=False))
+        self._saved_config = copy.deepcopy(self.config)
 
     def get_machine_id(self):
         """Get unique machine identifier"""
-        import socket
-        hostname = socket.gethostname()
-        machine_id = hashlib.md5(hostname.encode()).hexdigest()[:8]
-        return f"{hostname}_{machine_id}"
+        if self._machine_id is None:
+            import socket
+            hostname = socket.gethostname()
+            machine_id = hashlib.blake2s(hostname.encode(), digest_size=4).hexdigest()
+            self._machine_id = f"{hostname}_{machine_id}"
+        return self._machine_id
 
     def get_db_checksum(self):
-        """Calculate database checksum"""
+        """Calculate database checksum, reusing the cached one while the files are unchanged
+
+        Covers the -wal file too: in WAL mode committed writes can sit there while
+        the main file's size and mtime stay the same.
+        """
         if not os.path.exists(self.db_path):
             return None
 
+        st = os.stat(self.db_path)
+        wal_path = self.db_path + '-wal'
+        try:
+            wal_st = os.stat(wal_path)
+            wal_size, wal_mtime_ns = wal_st.st_size, wal_st.st_mtime_ns
+        except FileNotFoundError:
+            wal_size = wal_mtime_ns = None
+
+        cache = self.config.get('checksum_cache') or {}
+        if (cache.get('path') == self.db_path and cache.get('size') == st.st_size
+                and cache.get('mtime_ns') == st.st_mtime_ns
+                and cache.get('wal_size') == wal_size and cache.get('wal_mtime_ns') == wal_mtime_ns):
+            return cache['sha']
+
+        checksum = self._hash_db(include_wal=bool(wal_size))
+        self.config['checksum_cache'] = {
+            "path": self.db_path,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "wal_size": wal_size,
+            "wal_mtime_ns": wal_mtime_ns,
+            "sha": checksum
+        }
+        self.save_config()
+        return checksum
+
+    def _hash_db(self, include_wal=False):
+        """Hash the database file, followed by its -wal file if asked, with SHA-256"""
+        if not include_wal and hasattr(hashlib, 'file_digest'):
+            with open(self.db_path, 'rb') as f:
+                return hashlib.file_digest(f, 'sha256').hexdigest()
+
+        # Hash each whole mapping in one update() call
         hasher = hashlib.sha256()
-        with open(self.db_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b''):
-                hasher.update(chunk)
+        for path in (self.db_path, self.db_path + '-wal') if include_wal else (self.db_path,):
+            try:
+                f = open(path, 'rb')
+            except FileNotFoundError:
+                continue  # the -wal file was checkpointed away since it was stat'ed
+            with f:
+                if os.fstat(f.fileno()).st_size:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        hasher.update(mm)
         return hasher.hexdigest()
 
     def backup_db(self):
         """Create local backup before sync"""
+        if not os.path.exists(self.db_path):
+            print(f"Error: No local database at {self.db_path}")
+            return None
+
         backup_dir = os.path.expanduser("~/.claude/memory/backups")
         os.makedirs(backup_dir, exist_ok=True)
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         backup_path = os.path.join(backup_dir, f"context_{timestamp}.db")
 
-        import shutil
-        shutil.copy2(self.db_path, backup_path)
+        _sqlite_export(self.db_path, backup_path)
 
         print(f"✓ Backup created: {backup_path}")
         return backup_path
 
     # ===== S3 Sync Methods =====
 
+    def _snapshot(self):
+        """Write a consistent copy of the database, zstd-compressed when available
+
+        Returns (snapshot_path, page_count, compression), where compression is
+        'zstd' or 'none'.
+        """
+        snapshot_path = self.db_path + ".snapshot"
+
+        # The backup API copies a consistent image without blocking writers.
+        # The source opens read-only, so a missing database is an error rather than a new empty file.
+        page_count = _sqlite_export(self.db_path, snapshot_path)
+
+        zstandard = _zstandard()
+        if zstandard is None:
+            return snapshot_path, page_count, 'none'
+
+        compressed_path = snapshot_path + ".zst"
+        try:
+            with open(snapshot_path, 'rb') as ifh, open(compressed_path, 'wb') as ofh:
+                zstandard.ZstdCompressor(level=3, threads=-1).copy_stream(ifh, ofh)
+        finally:
+            os.remove(snapshot_path)
+
+        return compressed_path, page_count, 'zstd'
+
+    def get_s3_client(self):
+        """Get the S3 client, created once and shared by push and pull
+
+        boto3 is imported here so status and the Dropbox/git paths don't pay
+        for loading it.
+        """
+        if self._s3 is None:
+            import boto3
+            from boto3.s3.transfer import TransferConfig
+
+            self._s3 = boto3.client('s3')
+            # Small threshold + many parts so even modest databases stream in parallel
+            self._s3_transfer_config = TransferConfig(
+                multipart_threshold=4 * 1024 * 1024,
+                multipart_chunksize=8 * 1024 * 1024,
+                max_concurrency=16,
+                use_threads=True
+            )
+        return self._s3
+
     def upload_to_s3(self):
         """Upload database to S3"""
         if not self.config.get('s3_bucket'):
             print("Error: S3 bucket not configured")
             return False
 
+        if not os.path.exists(self.db_path):
+            print(f"Error: No local database at {self.db_path}")
+            return False
+
+        now_iso = datetime.now().isoformat()
+
         try:
-            s3 = boto3.client('s3')
+            s3 = self.get_s3_client()
+            checksum = self.get_db_checksum()
+
+            # Skip the upload when S3 already holds this exact database
+            if checksum and self._get_s3_checksum(s3) == checksum:
+                print(f"✓ s3://{self.config['s3_bucket']}/{self.config['s3_key']} is already up to date")
+                return True
 
-            # Create metadata
+            snapshot_path, page_count, compression = self._snapshot()
+
+            # Create metadata; the key is fixed, so readers learn the encoding from here
             metadata = {
                 'machine_id': self.config['machine_id'],
-                'sync_time': datetime.now().isoformat(),
-                'checksum': self.get_db_checksum()
+                'sync_time': now_iso,
+                'checksum': checksum,
+                'page_count': str(page_count),
+                'compression': compression
             }
+            content_type = 'application/zstd' if compression == 'zstd' else 'application/x-sqlite3'
 
             # Upload with metadata
-            s3.upload_file(
-                self.db_path,
-                self.config['s3_bucket'],
-                self.config['s3_key'],
-                ExtraArgs={'Metadata': metadata}
-            )
-
-            self.config['last_sync'] = datetime.now().isoformat()
+            try:
+                s3.upload_file(
+                    snapshot_path,
+                    self.config['s3_bucket'],
+                    self.config['s3_key'],
+                    ExtraArgs={'Metadata': metadata, 'ContentType': content_type},
+                    Config=self._s3_transfer_config
+                )
+            finally:
+                os.remove(snapshot_path)
+
+            self.config['last_sync'] = now_iso
             self.save_config()
 
             print(f"✓ Uploaded to s3://{self.config['s3_bucket']}/{self.config['s3_key']}")
@@ -114,6 +289,14 @@ class CloudSync:
             print(f"Error uploading to S3: {e}")
             return False
 
+    def _get_s3_checksum(self, s3):
+        """Get the checksum recorded on the current S3 object, if any"""
+        try:
+            response = s3.head_object(Bucket=self.config['s3_bucket'], Key=self.config['s3_key'])
+        except Exception:
+            return None
+        return response.get('Metadata', {}).get('checksum')
+
     def download_from_s3(self):
         """Download database from S3"""
         if not self.config.get('s3_bucket'):
@@ -121,35 +304,55 @@ class CloudSync:
             return False
 
         try:
-            s3 = boto3.client('s3')
+            s3 = self.get_s3_client()
+
+            key = self.config['s3_key']
 
             # Check if file exists
             try:
-                s3.head_object(Bucket=self.config['s3_bucket'], Key=self.config['s3_key'])
+                head = s3.head_object(Bucket=self.config['s3_bucket'], Key=key)
             except:
                 print("No backup found in S3")
                 return False
 
+            # Objects uploaded before compression support carry no compression metadata
+            compressed = head.get('Metadata', {}).get('compression') == 'zstd'
+            zstandard = _zstandard()
+            if compressed and zstandard is None:
+                print("Error: The S3 backup is zstd-compressed; install zstandard to restore it")
+                return False
+
             # Backup local DB first
             if os.path.exists(self.db_path):
                 self.backup_db()
 
             # Download
             temp_path = self.db_path + ".download"
+            download_path = temp_path + ".zst" if compressed else temp_path
             s3.download_file(
                 self.config['s3_bucket'],
-                self.config['s3_key'],
-                temp_path
+                key,
+                download_path,
+                Config=self._s3_transfer_config
             )
 
-            # Replace local DB
-            import shutil
-            shutil.move(temp_path, self.db_path)
+            if compressed:
+                try:
+                    with open(download_path, 'rb') as ifh, open(temp_path, 'wb') as ofh:
+                        zstandard.ZstdDecompressor().copy_stream(ifh, ofh)
+                finally:
+                    os.remove(download_path)
+
+            # Restore into the live database through SQLite, so a stale -wal can't be replayed onto it
+            try:
+                _sqlite_copy(temp_path, self.db_path)
+            finally:
+                os.remove(temp_path)
 
             self.config['last_sync'] = datetime.now().isoformat()
             self.save_config()
 
-            print(f"✓ Downloaded from s3://{self.config['s3_bucket']}/{self.config['s3_key']}")
+            print(f"✓ Downloaded from s3://{self.config['s3_bucket']}/{key}")
             return True
 
         except Exception as e:
@@ -160,11 +363,14 @@ class CloudSync:
 
     def upload_to_dropbox(self):
         """Upload database to Dropbox"""
+        if not os.path.exists(self.db_path):
+            print(f"Error: No local database at {self.db_path}")
+            return False
+
         dropbox_path = os.path.expanduser("~/Dropbox/AI-CLI-Memory/context.db")
         os.makedirs(os.path.dirname(dropbox_path), exist_ok=True)
 
-        import shutil
-        shutil.copy2(self.db_path, dropbox_path)
+        _sqlite_export(self.db_path, dropbox_path)
 
         self.config['last_sync'] = datetime.now().isoformat()
         self.save_config()
@@ -184,8 +390,7 @@ class CloudSync:
         if os.path.exists(self.db_path):
             self.backup_db()
 
-        import shutil
-        shutil.copy2(dropbox_path, self.db_path)
+        _sqlite_copy(dropbox_path, self.db_path)
 
         self.config['last_sync'] = datetime.now().isoformat()
         self.save_config()
@@ -201,29 +406,37 @@ class CloudSync:
         os.makedirs(sync_dir, exist_ok=True)
 
         if not os.path.exists(os.path.join(sync_dir, '.git')):
-            subprocess.run(['git', 'init'], cwd=sync_dir)
+            subprocess.run(['git', '-C', sync_dir, 'init'],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
             print(f"✓ Initialized git repository at {sync_dir}")
 
         return sync_dir
 
     def upload_to_git(self):
         """Commit and push to git"""
+        if not os.path.exists(self.db_path):
+            print(f"Error: No local database at {self.db_path}")
+            return False
+
+        now_iso = datetime.now().isoformat()
         sync_dir = self.init_git_sync()
 
         # Copy database to sync directory
-        import shutil
-        shutil.copy2(self.db_path, os.path.join(sync_dir, 'context.db'))
+        _sqlite_export(self.db_path, os.path.join(sync_dir, 'context.db'))
 
         # Commit
-        subprocess.run(['git', 'add', 'context.db'], cwd=sync_dir)
-        commit_msg = f"Sync from {self.config['machine_id']} at {datetime.now().isoformat()}"
-        subprocess.run(['git', 'commit', '-m', commit_msg], cwd=sync_dir)
+        # (add stays separate: `commit -a` skips context.db until it is tracked)
+        subprocess.run(['git', '-C', sync_dir, 'add', 'context.db'],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        commit_msg = f"Sync from {self.config['machine_id']} at {now_iso}"
+        subprocess.run(['git', '-C', sync_dir, 'commit', '-m', commit_msg],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
 
         # Push (requires remote to be configured)
-        result = subprocess.run(['git', 'push'], cwd=sync_dir, capture_output=True)
+        result = subprocess.run(['git', '-C', sync_dir, 'push'], capture_output=True)
 
         if result.returncode == 0:
-            self.config['last_sync'] = datetime.now().isoformat()
+            self.config['last_sync'] = now_iso
             self.save_config()
             print("✓ Pushed to git remote")
             return True
@@ -263,6 +476,13 @@ class CloudSync:
         """Smart sync: merge local and remote"""
         print("🔄 Syncing...")
 
+        # Nothing to do when S3 already holds this exact database
+        if self.sync_method == 's3' and self.config.get('s3_bucket'):
+            checksum = self.get_db_checksum()
+            if checksum and self._get_s3_checksum(self.get_s3_client()) == checksum:
+                print("✓ Already in sync")
+                return
+
         # For now, just do pull then push
         # TODO: Implement proper merge strategy
         self.pull()
@@ -294,78 +514,56 @@ class CloudSync:
 
 def main():
     """CLI interface"""
-    if len(sys.argv) < 2:
-        print("AI CLI Memory Cloud Sync")
-        print("\nUsage: cloud_sync.py <command> [options]")
-        print("\nCommands:")
-        print("  status              - Show sync status")
-        print("  push                - Push local DB to cloud")
-        print("  pull                - Pull DB from cloud")
-        print("  sync                - Smart sync (pull + push)")
-        print("  configure <method>  - Configure sync method")
-        print("                        Methods: s3, dropbox, git")
-        print("\nExamples:")
-        print("  # Configure S3 sync")
-        print("  cloud_sync.py configure s3 --bucket my-bucket")
-        print("")
-        print("  # Push to cloud")
-        print("  cloud_sync.py push")
-        print("")
-        print("  # Pull from cloud")
-        print("  cloud_sync.py pull")
+    parser = argparse.ArgumentParser(
+        prog="cloud_sync.py",
+        description="AI CLI Memory Cloud Sync",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""Examples:
+  # Configure S3 sync
+  cloud_sync.py configure s3 --bucket my-bucket
+
+  # Push to cloud
+  cloud_sync.py push
+
+  # Pull from cloud
+  cloud_sync.py pull"""
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="<command>")
+    subparsers.add_parser("status", help="Show sync status")
+    subparsers.add_parser("push", help="Push local DB to cloud")
+    subparsers.add_parser("pull", help="Pull DB from cloud")
+    subparsers.add_parser("sync", help="Smart sync (pull + push)")
+    subparsers.add_parser("backup", help="Create a local backup of the DB")
+
+    configure_parser = subparsers.add_parser("configure", help="Configure sync method")
+    configure_parser.add_argument("method", choices=["s3", "dropbox", "git"])
+    configure_parser.add_argument("--bucket", help="S3 bucket (required for s3)")
+
+    args = parser.parse_args()
+    if args.command is None:
+        parser.print_help()
         sys.exit(1)
 
-    syncer = CloudSync()
-    command = sys.argv[1]
-
-    if command == 'status':
-        syncer.status()
-
-    elif command == 'push':
-        syncer.push()
-
-    elif command == 'pull':
-        syncer.pull()
-
-    elif command == 'sync':
-        syncer.sync()
-
-    elif command == 'configure':
-        if len(sys.argv) < 3:
-            print("Error: Please specify sync method (s3, dropbox, git)")
-            sys.exit(1)
-
-        method = sys.argv[2]
-
-        if method == 's3':
-            # Parse --bucket argument
-            bucket = None
-            for i, arg in enumerate(sys.argv):
-                if arg == '--bucket' and i + 1 < len(sys.argv):
-                    bucket = sys.argv[i + 1]
-
-            if not bucket:
-                print("Error: Please specify S3 bucket with --bucket")
-                sys.exit(1)
-
-            syncer.configure('s3', bucket=bucket)
-
-        elif method == 'dropbox':
-            syncer.configure('dropbox')
+    if args.command == "configure" and args.method == "s3" and not args.bucket:
+        print("Error: Please specify S3 bucket with --bucket")
+        sys.exit(1)
 
-        elif method == 'git':
-            syncer.configure('git')
+    syncer = CloudSync()
 
+    if args.command == "configure":
+        if args.method == "s3":
+            syncer.configure("s3", bucket=args.bucket)
         else:
-            print(f"Unknown method: {method}")
-            sys.exit(1)
-
-    elif command == 'backup':
-        syncer.backup_db()
-
-    else:
-        print(f"Unknown command: {command}")
-        sys.exit(1)
+            syncer.configure(args.method)
+        return
+
+    {
+        "status": syncer.status,
+        "push": syncer.push,
+        "pull": syncer.pull,
+        "sync": syncer.sync,
+        "backup": syncer.backup_db,
+    }[args.command]()
 
 
 if __name__ == "__main__":
@@ -6,182 +6,205 @@ Web-based visualization of your memory and stats
 
 import os
 import json
-import sqlite3
 from datetime import datetime, timedelta
 from pathlib import Path
 from flask import Flask, render_template, jsonify, send_from_directory
-from memory_manager import MemoryManager
+from memory_manager import MemoryManager, rows_to_dicts
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from flask_caching import Cache
+except ImportError:
+    Cache = None
 
 app = Flask(__name__)
+# The page polls every 30s; cache the aggregate queries so extra tabs don't re-run them
+if Cache is not None:
+    cache = Cache(app, config={'CACHE_TYPE': 'SimpleCache', 'CACHE_DEFAULT_TIMEOUT': 15})
+else:
+    cache = None
 manager = MemoryManager()
 
+def _cached(timeout):
+    """Cache a route's response for timeout seconds (uncached without Flask-Caching)"""
+    if cache is None:
+        return lambda view: view
+    return cache.cached(timeout=timeout, query_string=True)
+
+def _json(obj):
+    """JSON response, encoded with orjson when it's installed"""
+    if orjson is None:
+        return jsonify(obj)
+    return app.response_class(orjson.dumps(obj), mimetype='application/json')
+
 @app.route('/')
 def index():
     """Main dashboard page"""
     return render_template('dashboard.html')
 
 @app.route('/api/stats')
+@_cached(15)
 def api_stats():
     """Get overall statistics"""
-    stats = manager.get_stats()
-    return jsonify(stats)
+    with manager.read_conn() as conn:
+        stats = manager.get_stats(conn=conn)
+    return _json(stats)
 
 @app.route('/api/sessions/recent')
+@_cached(5)
 def api_recent_sessions():
     """Get recent sessions"""
     limit = request.args.get('limit', 50, type=int)
 
-    conn = sqlite3.connect(manager.db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    with manager.read_conn() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT * FROM recent_sessions
-        LIMIT ?
-    """, (limit,))
+        cutoff = (datetime.now() - timedelta(days=7)).isoformat()
+        cursor.execute("""
+            SELECT * FROM recent_sessions_mat
+            WHERE start_time >= ?
+            ORDER BY start_time DESC
+            LIMIT ?
+        """, (cutoff, limit))
 
-    sessions = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+        sessions = rows_to_dicts(cursor)
 
-    return jsonify(sessions)
+    return _json(sessions)
 
 @app.route('/api/projects')
+@_cached(15)
 def api_projects():
     """Get project statistics"""
-    conn = sqlite3.connect(manager.db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    with manager.read_conn() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("SELECT * FROM project_stats")
-    projects = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+        cursor.execute("SELECT * FROM project_stats")
+        projects = rows_to_dicts(cursor)
 
-    return jsonify(projects)
+    return _json(projects)
 
 @app.route('/api/knowledge')
 def api_knowledge():
     """Get knowledge base entries"""
     category = request.args.get('category', None)
 
-    conn = sqlite3.connect(manager.db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    with manager.read_conn() as conn:
+        cursor = conn.cursor()
 
-    if category:
-        cursor.execute("""
-            SELECT * FROM knowledge_base
-            WHERE category = ?
-            ORDER BY frequency DESC, last_used DESC
-            LIMIT 100
-        """, (category,))
-    else:
-        cursor.execute("""
-            SELECT * FROM knowledge_base
-            ORDER BY frequency DESC, last_used DESC
-            LIMIT 100
-        """)
+        if category:
+            cursor.execute("""
+                SELECT * FROM knowledge_base
+                WHERE category = ?
+                ORDER BY frequency DESC, last_used DESC
+                LIMIT 100
+            """, (category,))
+        else:
+            cursor.execute("""
+                SELECT * FROM knowledge_base
+                ORDER BY frequency DESC, last_used DESC
+                LIMIT 100
+            """)
 
-    knowledge = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+        knowledge = rows_to_dicts(cursor)
 
-    return jsonify(knowledge)
+    return _json(knowledge)
 
 @app.route('/api/timeline')
+@_cached(15)
 def api_timeline():
     """Get activity timeline"""
     days = request.args.get('days', 30, type=int)
+    # Filtering on DATE(start_time) lets SQLite range-search idx_sessions_date_tool, which also serves the GROUP BY
+    cutoff = (datetime.now() - timedelta(days=days)).date().isoformat()
 
-    conn = sqlite3.connect(manager.db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    with manager.read_conn() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT
-            DATE(start_time) as date,
-            cli_tool,
-            COUNT(*) as sessions,
-            SUM(duration_seconds) as total_time
-        FROM sessions
-        WHERE start_time >= datetime('now', '-' || ? || ' days')
-        GROUP BY DATE(start_time), cli_tool
-        ORDER BY date DESC
-    """, (days,))
+        cursor.execute("""
+            SELECT
+                DATE(start_time) as date,
+                cli_tool,
+                COUNT(*) as sessions,
+                SUM(duration_seconds) as total_time
+            FROM sessions
+            WHERE DATE(start_time) >= ?
+            GROUP BY DATE(start_time), cli_tool
+            ORDER BY date DESC
+        """, (cutoff,))
 
-    timeline = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+        timeline = rows_to_dicts(cursor)
 
-    return jsonify(timeline)
+    return _json(timeline)
 
 @app.route('/api/files/top')
+@_cached(15)
 def api_top_files():
     """Get most modified files"""
     limit = request.args.get('limit', 20, type=int)
 
-    conn = sqlite3.connect(manager.db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT
-            file_path,
-            language,
-            COUNT(*) as modifications,
-            SUM(lines_added) as total_added,
-            SUM(lines_removed) as total_removed
-        FROM session_files
-        GROUP BY file_path
-        ORDER BY modifications DESC
-        LIMIT ?
-    """, (limit,))
+    with manager.read_conn() as conn:
+        cursor = conn.cursor()
 
-    files = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-
-    return jsonify(files)
+        cursor.execute("""
+            SELECT
+                file_path,
+                language,
+                COUNT(*) as modifications,
+                SUM(lines_added) as total_added,
+                SUM(lines_removed) as total_removed
+            FROM session_files
+            GROUP BY file_path
+            ORDER BY modifications DESC
+            LIMIT ?
+        """, (limit,))
+
+        files = rows_to_dicts(cursor)
+
+    return _json(files)
 
 @app.route('/api/search')
 def api_search():
     """Search across memory"""
     query = request.args.get('q', '')
 
-    if not query:
-        return jsonify([])
+    if not query.strip():
+        return _json([])
 
-    conn = sqlite3.connect(manager.db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    # Quote each word so FTS5 syntax in the query is matched literally; * matches word prefixes
+    fts_query = ' '.join('"' + term.replace('"', '""') + '"*' for term in query.split())
 
-    # Search in knowledge base
-    cursor.execute("""
-        SELECT 'knowledge' as type, title, description, category, frequency
-        FROM knowledge_base
-        WHERE title LIKE ? OR description LIKE ?
-        ORDER BY frequency DESC
-        LIMIT 10
-    """, (f'%{query}%', f'%{query}%'))
+    with manager.read_conn() as conn:
+        cursor = conn.cursor()
 
-    results = [dict(row) for row in cursor.fetchall()]
-
-    # Search in context
-    cursor.execute("""
-        SELECT DISTINCT 'context' as type, context_type, context_data
-        FROM session_context
-        WHERE context_data LIKE ?
-        LIMIT 10
-    """, (f'%{query}%',))
+        # Search in knowledge base
+        cursor.execute("""
+            SELECT 'knowledge' as type, kb.title, kb.description, kb.category, kb.frequency
+            FROM knowledge_fts
+            JOIN knowledge_base kb ON kb.id = knowledge_fts.rowid
+            WHERE knowledge_fts MATCH ?
+            ORDER BY rank
+            LIMIT 10
+        """, (fts_query,))
 
-    results.extend([dict(row) for row in cursor.fetchall()])
+        results = rows_to_dicts(cursor)
 
-    conn.close()
+        # Search in context
+        cursor.execute("""
+            SELECT DISTINCT 'context' as type, context_type, context_data
+            FROM session_context
+            WHERE context_data LIKE ?
+            LIMIT 10
+        """, (f'%{query}%',))
 
-    return jsonify(results)
+        results.extend(rows_to_dicts(cursor))
 
-def create_html_template():
-    """Create dashboard HTML template"""
-    template_dir = os.path.expanduser("~/ai-cli-memory-system/templates")
-    os.makedirs(template_dir, exist_ok=True)
+    return _json(results)
 
-    html = """<!DOCTYPE html>
+DASHBOARD_HTML = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -414,8 +437,21 @@ def create_html_template():
 </body>
 </html>"""
 
-    with open(os.path.join(template_dir, 'dashboard.html'), 'w') as f:
-        f.write(html)
+def create_html_template():
+    """Create dashboard HTML template (left alone if it's already up to date)"""
+    template_dir = os.path.expanduser("~/ai-cli-memory-system/templates")
+    template_path = os.path.join(template_dir, 'dashboard.html')
+
+    try:
+        with open(template_path, encoding='utf-8') as f:
+            if f.read() == DASHBOARD_HTML:
+                return
+    except OSError:
+        pass
+
+    os.makedirs(template_dir, exist_ok=True)
+    with open(template_path, 'w', encoding='utf-8') as f:
+        f.write(DASHBOARD_HTML)
 
 if __name__ == '__main__':
     from flask import request
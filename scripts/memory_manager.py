@@ -7,40 +7,200 @@ Handles session tracking, context capture, and intelligent retrieval
 import os
 import sys
 import json
+import queue
+import atexit
 import sqlite3
-import hashlib
+import secrets
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 import subprocess
 
+try:
+    import apsw
+except ImportError:
+    apsw = None
+
+# Errors a flush can hit from either driver: a constraint violation on some row, or any database error
+_CONSTRAINT_ERRORS = (sqlite3.IntegrityError,) + ((apsw.ConstraintError,) if apsw is not None else ())
+_DB_ERRORS = (sqlite3.Error,) + ((apsw.Error,) if apsw is not None else ())
+
+# Hot-path statements, kept as constants so every call hits the same cached prepared statement
+_SQL_INSERT_CONTEXT = """
+    INSERT INTO session_context (session_id, context_type, context_data, timestamp)
+    VALUES (?, ?, ?, ?)
+"""
+_SQL_INSERT_FILE = """
+    INSERT INTO session_files (session_id, file_path, action, language, lines_added, lines_removed, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_INSERT_COMMAND = """
+    INSERT INTO session_commands (session_id, command, exit_code, output_summary, timestamp)
+    VALUES (?, ?, ?, ?, ?)
+"""
+_SQL_INSERT_BY_KIND = {
+    "context": _SQL_INSERT_CONTEXT,
+    "files": _SQL_INSERT_FILE,
+    "commands": _SQL_INSERT_COMMAND,
+}
+
+def rows_to_dicts(cursor: sqlite3.Cursor) -> List[Dict[str, Any]]:
+    """Read a query's remaining rows off the cursor as dicts keyed by column name"""
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor]
+
 class MemoryManager:
+    # Buffered log rows that trigger a flush()
+    FLUSH_THRESHOLD = 100
+    # How long get_relevant_context results are reused, and how many are kept
+    CONTEXT_CACHE_TTL = 30
+    CONTEXT_CACHE_SIZE = 128
+
     def __init__(self, db_path: Optional[str] = None):
         if db_path is None:
             db_path = os.path.expanduser("~/.claude/memory/context.db")
 
         self.db_path = db_path
+
+        # One writer serialized by a lock, plus a pool of readers (WAL lets them run concurrently)
+        self._write_conn = None
+        self._apsw_conn = None
+        self._write_lock = threading.Lock()
+        self._read_pool_size = max(1, int(os.environ.get("AI_MEMORY_READ_POOL_SIZE", os.cpu_count() or 4)))
+        self._read_pool = queue.Queue(maxsize=self._read_pool_size)
+        self._read_conns = []
+        self._read_conns_lock = threading.Lock()
+        atexit.register(self.close)
+
+        # log_* rows are buffered and written in batches by flush()
+        self._pending = {"context": [], "files": [], "commands": []}
+        self._pending_lock = threading.Lock()
+        atexit.register(self.flush)  # atexit runs in reverse, so this flushes before close()
+
+        # (cwd, git_branch, file_patterns, limit) -> (expires_at, context)
+        self._context_cache: Dict[tuple, tuple] = {}
+
         self.ensure_db_exists()
 
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a connection that may be handed between threads
+
+        Read-only connections go through a mode=ro URI, so they can never take a write lock.
+        """
+        if read_only:
+            database = Path(self.db_path).absolute().as_uri() + "?mode=ro"
+        else:
+            database = self.db_path
+        conn = sqlite3.connect(database, uri=read_only, check_same_thread=False, cached_statements=256)
+        self._configure_connection(conn, read_only)
+        return conn
+
+    @staticmethod
+    def _configure_connection(conn, read_only: bool = False):
+        """Tune a connection: WAL so readers don't block on the writer, a 20MB page cache,
+        and a busy timeout instead of failing straight away with SQLITE_BUSY"""
+        pragmas = [
+            "PRAGMA busy_timeout=5000",
+            "PRAGMA cache_size=-20000",
+            "PRAGMA temp_store=MEMORY",
+        ]
+        if not read_only:
+            # Only meaningful (or allowed) on the connections that write
+            pragmas += [
+                "PRAGMA journal_mode=WAL",
+                "PRAGMA synchronous=NORMAL",
+                "PRAGMA foreign_keys=ON",
+            ]
+
+        # One statement at a time, so this works for both sqlite3 and apsw connections
+        for pragma in pragmas:
+            conn.execute(pragma).fetchall()
+
+    def _log_writer(self):
+        """apsw connection that flush() writes log rows through (call with _write_lock held)"""
+        if self._apsw_conn is None:
+            self._apsw_conn = apsw.Connection(self.db_path)
+            self._configure_connection(self._apsw_conn)
+        return self._apsw_conn
+
+    @contextmanager
+    def write_conn(self):
+        """Borrow the writer connection; commits on success, rolls back on error"""
+        with self._write_lock:
+            if self._write_conn is None:
+                self._write_conn = self._connect()
+            with self._write_conn:
+                yield self._write_conn
+            # Any write may change what get_relevant_context would return
+            self._context_cache.clear()
+
+    @contextmanager
+    def read_conn(self):
+        """Borrow a reader connection from the pool, opening one if the pool isn't full yet"""
+        try:
+            conn = self._read_pool.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._read_conns_lock:
+                if len(self._read_conns) < self._read_pool_size:
+                    conn = self._connect(read_only=True)
+                    self._read_conns.append(conn)
+            if conn is None:
+                conn = self._read_pool.get()
+
+        try:
+            yield conn
+        finally:
+            self._read_pool.put(conn)
+
+    @contextmanager
+    def _reader(self, conn: Optional[sqlite3.Connection] = None):
+        """Use the caller's connection if one was passed, otherwise borrow a reader"""
+        if conn is not None:
+            yield conn
+        else:
+            with self.read_conn() as conn:
+                yield conn
+
+    def close(self):
+        """Close every pooled connection"""
+        with self._write_lock:
+            if self._write_conn is not None:
+                # Refresh planner statistics that have drifted since the last ANALYZE
+                self._write_conn.execute("PRAGMA optimize")
+                self._write_conn.close()
+                self._write_conn = None
+            if self._apsw_conn is not None:
+                self._apsw_conn.close()
+                self._apsw_conn = None
+        with self._read_conns_lock:
+            for conn in self._read_conns:
+                conn.close()
+            self._read_conns.clear()
+            while not self._read_pool.empty():
+                self._read_pool.get_nowait()
+
     def ensure_db_exists(self):
         """Initialize database if it doesn't exist"""
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
 
-        conn = sqlite3.connect(self.db_path)
         schema_path = os.path.expanduser("~/ai-cli-memory-system/sql/schema.sql")
 
-        if os.path.exists(schema_path):
-            with open(schema_path, 'r') as f:
-                conn.executescript(f.read())
+        with self.write_conn() as conn:
+            if os.path.exists(schema_path):
+                with open(schema_path, 'r') as f:
+                    conn.executescript(f.read())
 
-        conn.commit()
-        conn.close()
+            # Gather planner statistics once so the indexes above get picked
+            if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone():
+                conn.execute("ANALYZE")
 
     def generate_session_id(self, cli_tool: str) -> str:
-        """Generate unique session ID"""
-        timestamp = datetime.now().isoformat()
-        unique_str = f"{cli_tool}_{timestamp}_{os.getpid()}"
-        return hashlib.sha256(unique_str.encode()).hexdigest()[:16]
+        """Generate unique session ID (16 random hex chars)"""
+        return secrets.token_hex(8)
 
     def start_session(self, cli_tool: str) -> str:
         """Start a new session and return session_id"""
@@ -53,224 +213,263 @@ class MemoryManager:
         git_commit = None
 
         try:
-            git_repo = subprocess.check_output(
-                ["git", "rev-parse", "--show-toplevel"],
-                stderr=subprocess.DEVNULL,
-                text=True
-            ).strip()
-
-            git_branch = subprocess.check_output(
-                ["git", "branch", "--show-current"],
-                stderr=subprocess.DEVNULL,
-                text=True
-            ).strip()
-
-            git_commit = subprocess.check_output(
-                ["git", "rev-parse", "HEAD"],
+            # One git process for all three: top-level dir, commit, then branch
+            result = subprocess.run(
+                ["git", "rev-parse", "--show-toplevel", "HEAD", "--abbrev-ref", "HEAD"],
+                stdout=subprocess.PIPE,
                 stderr=subprocess.DEVNULL,
                 text=True
-            ).strip()
+            )
+            lines = result.stdout.splitlines()
+
+            if result.returncode == 0 and len(lines) == 3:
+                git_repo, git_commit, git_branch = lines
+                if git_branch == "HEAD":
+                    git_branch = ""  # Detached HEAD, as `git branch --show-current` reports it
+            elif lines:
+                # Repo without commits yet: HEAD doesn't resolve, but the branch is named
+                git_repo = lines[0]
+                git_branch = subprocess.check_output(
+                    ["git", "branch", "--show-current"],
+                    stderr=subprocess.DEVNULL,
+                    text=True
+                ).strip()
         except:
             pass
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            INSERT INTO sessions (session_id, cli_tool, start_time, working_dir, git_repo, git_branch, git_commit)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (session_id, cli_tool, datetime.now().isoformat(), cwd, git_repo, git_branch, git_commit))
+        with self.write_conn() as conn:
+            cursor = conn.cursor()
 
-        # Update or create project entry
-        if git_repo:
             cursor.execute("""
-                INSERT INTO projects (project_path, project_name, last_session_id, session_count, updated_at)
-                VALUES (?, ?, ?, 1, ?)
-                ON CONFLICT(project_path) DO UPDATE SET
-                    last_session_id = excluded.last_session_id,
-                    session_count = session_count + 1,
-                    updated_at = excluded.updated_at
-            """, (git_repo, os.path.basename(git_repo), session_id, datetime.now().isoformat()))
-
-        conn.commit()
-        conn.close()
+                INSERT INTO sessions (session_id, cli_tool, start_time, working_dir, git_repo, git_branch, git_commit)
+                VALUES (?, ?, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'), ?, ?, ?, ?)
+            """, (session_id, cli_tool, cwd, git_repo, git_branch, git_commit))
+
+            # Update or create project entry
+            if git_repo:
+                cursor.execute("""
+                    INSERT INTO projects (project_path, project_name, last_session_id, session_count, updated_at)
+                    VALUES (?, ?, ?, 1, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'))
+                    ON CONFLICT(project_path) DO UPDATE SET
+                        last_session_id = excluded.last_session_id,
+                        session_count = session_count + 1,
+                        updated_at = excluded.updated_at
+                """, (git_repo, os.path.basename(git_repo), session_id))
 
         return session_id
 
     def end_session(self, session_id: str, exit_code: int = 0):
         """End a session and calculate duration"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            UPDATE sessions
-            SET end_time = ?,
-                exit_code = ?,
-                duration_seconds = (
-                    SELECT (julianday(?) - julianday(start_time)) * 86400
-                    FROM sessions WHERE session_id = ?
-                )
-            WHERE session_id = ?
-        """, (datetime.now().isoformat(), exit_code, datetime.now().isoformat(), session_id, session_id))
-
-        # Update project total time
-        cursor.execute("""
-            UPDATE projects
-            SET total_time_seconds = total_time_seconds + (
-                SELECT duration_seconds FROM sessions WHERE session_id = ?
-            )
-            WHERE project_path = (
-                SELECT git_repo FROM sessions WHERE session_id = ?
-            )
-        """, (session_id, session_id))
-
-        conn.commit()
-        conn.close()
+        with self.write_conn() as conn:
+            cursor = conn.cursor()
+
+            # 'now' is fixed for the whole statement, so end_time and the duration agree
+            row = cursor.execute("""
+                UPDATE sessions
+                SET end_time = strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'),
+                    exit_code = ?,
+                    duration_seconds = (julianday('now', 'localtime') - julianday(start_time)) * 86400
+                WHERE session_id = ?
+                RETURNING duration_seconds, git_repo
+            """, (exit_code, session_id)).fetchone()
+
+            # Update project total time
+            if row and row[1]:
+                cursor.execute("""
+                    UPDATE projects
+                    SET total_time_seconds = total_time_seconds + ?
+                    WHERE project_path = ?
+                """, row)
+
+        self.flush()
+
+    def _buffer(self, kind: str, row: tuple):
+        """Queue a log row, flushing once enough rows have piled up"""
+        with self._pending_lock:
+            self._pending[kind].append(row)
+            pending = sum(len(rows) for rows in self._pending.values())
+
+        if pending >= self.FLUSH_THRESHOLD:
+            self.flush()
+
+    def flush(self):
+        """Write all buffered log rows in a single transaction
+
+        If a row violates a constraint (e.g. a command for an unknown session) the
+        batch is retried row by row and only the offending rows are dropped. On any
+        other database error the rows stay buffered for the next flush.
+        """
+        with self._pending_lock:
+            if not any(self._pending.values()):
+                return
+
+            try:
+                try:
+                    if apsw is not None:
+                        self._flush_apsw()
+                    else:
+                        with self.write_conn() as conn:
+                            conn.execute("BEGIN IMMEDIATE")
+                            conn.executemany(_SQL_INSERT_CONTEXT, self._pending["context"])
+                            conn.executemany(_SQL_INSERT_FILE, self._pending["files"])
+                            conn.executemany(_SQL_INSERT_COMMAND, self._pending["commands"])
+                except _CONSTRAINT_ERRORS:
+                    self._flush_row_by_row()
+            except _DB_ERRORS as e:
+                print(f"Warning: could not write buffered log rows, will retry: {e}", file=sys.stderr)
+                return
+
+            for rows in self._pending.values():
+                rows.clear()
+
+    def _flush_row_by_row(self):
+        """flush() one row at a time, logging and skipping rows that violate a constraint"""
+        with self.write_conn() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for kind, rows in self._pending.items():
+                for row in rows:
+                    try:
+                        conn.execute(_SQL_INSERT_BY_KIND[kind], row)
+                    except sqlite3.IntegrityError as e:
+                        print(f"Warning: dropped buffered {kind} row for session {row[0]}: {e}", file=sys.stderr)
+
+    def _flush_apsw(self):
+        """flush() through apsw, which skips the sqlite3 module's per-row DB-API overhead"""
+        with self._write_lock:
+            conn = self._log_writer()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(_SQL_INSERT_CONTEXT, self._pending["context"])
+                conn.executemany(_SQL_INSERT_FILE, self._pending["files"])
+                conn.executemany(_SQL_INSERT_COMMAND, self._pending["commands"])
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            self._context_cache.clear()
 
     def log_context(self, session_id: str, context_type: str, context_data: Dict[str, Any]):
         """Log contextual information during a session"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            INSERT INTO session_context (session_id, context_type, context_data, timestamp)
-            VALUES (?, ?, ?, ?)
-        """, (session_id, context_type, json.dumps(context_data), datetime.now().isoformat()))
-
-        conn.commit()
-        conn.close()
+        self._buffer("context", (session_id, context_type, json.dumps(context_data), datetime.now().isoformat()))
 
     def log_file_action(self, session_id: str, file_path: str, action: str,
                        language: Optional[str] = None, lines_added: int = 0, lines_removed: int = 0):
         """Log file modifications"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            INSERT INTO session_files (session_id, file_path, action, language, lines_added, lines_removed, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (session_id, file_path, action, language, lines_added, lines_removed, datetime.now().isoformat()))
-
-        conn.commit()
-        conn.close()
+        self._buffer("files", (session_id, file_path, action, language, lines_added, lines_removed, datetime.now().isoformat()))
 
     def log_command(self, session_id: str, command: str, exit_code: int, output_summary: Optional[str] = None):
         """Log executed commands"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            INSERT INTO session_commands (session_id, command, exit_code, output_summary, timestamp)
-            VALUES (?, ?, ?, ?, ?)
-        """, (session_id, command, exit_code, output_summary, datetime.now().isoformat()))
-
-        conn.commit()
-        conn.close()
+        self._buffer("commands", (session_id, command, exit_code, output_summary, datetime.now().isoformat()))
 
     def add_knowledge(self, category: str, title: str, description: str,
                      context: Optional[Dict] = None, source_session: Optional[str] = None):
         """Add to knowledge base"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.write_conn() as conn:
+            cursor = conn.cursor()
 
-        source_sessions = json.dumps([source_session]) if source_session else None
+            source_sessions = json.dumps([source_session]) if source_session else None
 
-        cursor.execute("""
-            INSERT INTO knowledge_base (category, title, description, context, source_sessions, last_used)
-            VALUES (?, ?, ?, ?, ?, ?)
-            ON CONFLICT(title) DO UPDATE SET
-                frequency = frequency + 1,
-                last_used = excluded.last_used,
-                updated_at = CURRENT_TIMESTAMP
-        """, (category, title, description, json.dumps(context) if context else None,
-              source_sessions, datetime.now().isoformat()))
-
-        conn.commit()
-        conn.close()
+            cursor.execute("""
+                INSERT INTO knowledge_base (category, title, description, context, source_sessions, last_used)
+                VALUES (?, ?, ?, ?, ?, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'))
+                ON CONFLICT(title) DO UPDATE SET
+                    frequency = frequency + 1,
+                    last_used = excluded.last_used,
+                    updated_at = CURRENT_TIMESTAMP
+            """, (category, title, description, json.dumps(context) if context else None,
+                  source_sessions))
 
     def get_relevant_context(self, cwd: Optional[str] = None,
                            git_branch: Optional[str] = None,
                            file_patterns: Optional[List[str]] = None,
-                           limit: int = 10) -> Dict[str, Any]:
-        """Retrieve relevant context for current work"""
+                           limit: int = 10,
+                           conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
+        """Retrieve relevant context for current work (cached for CONTEXT_CACHE_TTL seconds)"""
         if cwd is None:
             cwd = os.getcwd()
 
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        key = (cwd, git_branch, tuple(file_patterns or ()), limit)
+        cached = self._context_cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
 
-        context = {
-            "recent_sessions": [],
-            "project_patterns": [],
-            "relevant_knowledge": [],
-            "similar_files": []
-        }
+        with self._reader(conn) as conn:
+            cursor = conn.cursor()
+
+            context = {
+                "recent_sessions": [],
+                "project_patterns": [],
+                "relevant_knowledge": [],
+                "similar_files": []
+            }
 
-        # Get recent sessions in this directory
-        cursor.execute("""
-            SELECT * FROM recent_sessions
-            WHERE working_dir = ?
-            LIMIT ?
-        """, (cwd, limit))
-        context["recent_sessions"] = [dict(row) for row in cursor.fetchall()]
-
-        # Get project-specific patterns
-        cursor.execute("""
-            SELECT pp.* FROM project_patterns pp
-            JOIN projects p ON pp.project_id = p.id
-            WHERE p.project_path = (
-                SELECT git_repo FROM sessions
+            # Get recent sessions in this directory
+            cursor.execute("""
+                SELECT * FROM recent_sessions
                 WHERE working_dir = ?
-                ORDER BY start_time DESC LIMIT 1
-            )
-            ORDER BY pp.confidence DESC
-        """, (cwd,))
-        context["project_patterns"] = [dict(row) for row in cursor.fetchall()]
+                LIMIT ?
+            """, (cwd, limit))
+            context["recent_sessions"] = rows_to_dicts(cursor)
 
-        # Get relevant knowledge
-        cursor.execute("""
-            SELECT * FROM knowledge_base
-            ORDER BY frequency DESC, last_used DESC
-            LIMIT ?
-        """, (limit,))
-        context["relevant_knowledge"] = [dict(row) for row in cursor.fetchall()]
+            # Get project-specific patterns
+            cursor.execute("""
+                SELECT pp.* FROM project_patterns pp
+                JOIN projects p ON pp.project_id = p.id
+                WHERE p.project_path = (
+                    SELECT git_repo FROM sessions
+                    WHERE working_dir = ?
+                    ORDER BY start_time DESC LIMIT 1
+                )
+                ORDER BY pp.confidence DESC
+            """, (cwd,))
+            context["project_patterns"] = rows_to_dicts(cursor)
 
-        conn.close()
+            # Get relevant knowledge
+            cursor.execute("""
+                SELECT * FROM knowledge_base
+                ORDER BY frequency DESC, last_used DESC
+                LIMIT ?
+            """, (limit,))
+            context["relevant_knowledge"] = rows_to_dicts(cursor)
+
+        if len(self._context_cache) >= self.CONTEXT_CACHE_SIZE:
+            self._context_cache.pop(next(iter(self._context_cache)), None)
+        self._context_cache[key] = (time.monotonic() + self.CONTEXT_CACHE_TTL, context)
 
         return context
 
     def create_weekly_summary(self, year: int, week: int, cli_tool: str):
         """Create compressed weekly summary"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Get all sessions for this week
-        cursor.execute("""
-            SELECT
-                working_dir,
-                COUNT(*) as session_count,
-                SUM(duration_seconds) as total_time,
-                GROUP_CONCAT(DISTINCT git_branch) as branches,
-                COUNT(DISTINCT session_id) as unique_sessions
-            FROM sessions
-            WHERE cli_tool = ?
-                AND strftime('%Y', start_time) = ?
-                AND strftime('%W', start_time) = ?
-            GROUP BY working_dir
-        """, (cli_tool, str(year), f"{week:02d}"))
-
-        for row in cursor.fetchall():
-            working_dir, session_count, total_time, branches, unique_sessions = row
-
-            # Get detailed context for summary
-            summary_data = {
-                "branches_worked_on": branches.split(',') if branches else [],
-                "unique_sessions": unique_sessions,
-                "average_session_time": total_time / session_count if session_count > 0 else 0
-            }
+        with self.write_conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
 
+            # Get all sessions for this week
             cursor.execute("""
+                SELECT
+                    working_dir,
+                    COUNT(*) as session_count,
+                    SUM(duration_seconds) as total_time,
+                    json_group_array(DISTINCT git_branch) FILTER (WHERE git_branch IS NOT NULL) as branches,
+                    COUNT(DISTINCT session_id) as unique_sessions
+                FROM sessions
+                WHERE cli_tool = ?
+                    AND strftime('%Y', start_time) = ?
+                    AND strftime('%W', start_time) = ?
+                GROUP BY working_dir
+            """, (cli_tool, str(year), f"{week:02d}"))
+
+            rows = []
+            for working_dir, session_count, total_time, branches, unique_sessions in cursor:
+                # Get detailed context for summary
+                summary_data = {
+                    "branches_worked_on": json.loads(branches),
+                    "unique_sessions": unique_sessions,
+                    "average_session_time": total_time / session_count if session_count > 0 else 0
+                }
+                rows.append((year, week, cli_tool, working_dir, json.dumps(summary_data), session_count, total_time))
+
+            cursor.executemany("""
                 INSERT INTO weekly_summaries (year, week_number, cli_tool, project_path, summary_data, session_count, total_time_seconds)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
                 ON CONFLICT(year, week_number, cli_tool, project_path) DO UPDATE SET
@@ -278,84 +477,76 @@ class MemoryManager:
                     session_count = excluded.session_count,
                     total_time_seconds = excluded.total_time_seconds,
                     created_at = CURRENT_TIMESTAMP
-            """, (year, week, cli_tool, working_dir, json.dumps(summary_data), session_count, total_time))
-
-        conn.commit()
-        conn.close()
+            """, rows)
 
-    def export_context_for_mcp(self) -> Dict[str, Any]:
+    def export_context_for_mcp(self, conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
         """Export context in MCP memory-compatible format"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        # Get entities
-        cursor.execute("SELECT * FROM entities")
-        entities = [dict(row) for row in cursor.fetchall()]
-
-        # Get relations
-        cursor.execute("""
-            SELECT
-                e1.entity_name as from_name,
-                er.relation_type,
-                e2.entity_name as to_name,
-                er.strength
-            FROM entity_relations er
-            JOIN entities e1 ON er.from_entity_id = e1.id
-            JOIN entities e2 ON er.to_entity_id = e2.id
-        """)
-        relations = [dict(row) for row in cursor.fetchall()]
-
-        conn.close()
+        with self._reader(conn) as conn:
+            cursor = conn.cursor()
+
+            # Get entities
+            cursor.execute("SELECT * FROM entities")
+            entities = rows_to_dicts(cursor)
+
+            # Get relations
+            cursor.execute("""
+                SELECT
+                    e1.entity_name as from_name,
+                    er.relation_type,
+                    e2.entity_name as to_name,
+                    er.strength
+                FROM entity_relations er
+                JOIN entities e1 ON er.from_entity_id = e1.id
+                JOIN entities e2 ON er.to_entity_id = e2.id
+            """)
+            relations = rows_to_dicts(cursor)
 
         return {
             "entities": entities,
             "relations": relations
         }
 
-    def get_stats(self) -> Dict[str, Any]:
+    def get_stats(self, conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
         """Get overall statistics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        stats = {}
-
-        # Total sessions by tool
-        cursor.execute("""
-            SELECT cli_tool, COUNT(*) as count, SUM(duration_seconds) as total_time
-            FROM sessions
-            GROUP BY cli_tool
-        """)
-        stats["by_tool"] = {row[0]: {"sessions": row[1], "total_time": row[2]} for row in cursor.fetchall()}
-
-        # Recent activity (last 7 days)
-        cursor.execute("""
-            SELECT DATE(start_time) as date, COUNT(*) as sessions
-            FROM sessions
-            WHERE start_time >= datetime('now', '-7 days')
-            GROUP BY DATE(start_time)
-            ORDER BY date
-        """)
-        stats["recent_activity"] = [{"date": row[0], "sessions": row[1]} for row in cursor.fetchall()]
-
-        # Most active projects
-        cursor.execute("""
-            SELECT project_path, project_name, session_count, total_time_seconds
-            FROM projects
-            ORDER BY session_count DESC
-            LIMIT 10
-        """)
-        stats["top_projects"] = [
-            {
-                "path": row[0],
-                "name": row[1],
-                "sessions": row[2],
-                "time": row[3]
-            }
-            for row in cursor.fetchall()
-        ]
+        with self._reader(conn) as conn:
+            cursor = conn.cursor()
 
-        conn.close()
+            stats = {}
+
+            # Total sessions by tool
+            cursor.execute("""
+                SELECT cli_tool, COUNT(*) as count, SUM(duration_seconds) as total_time
+                FROM sessions
+                GROUP BY cli_tool
+            """)
+            stats["by_tool"] = {row[0]: {"sessions": row[1], "total_time": row[2]} for row in cursor}
+
+            # Recent activity (last 7 days)
+            cursor.execute("""
+                SELECT DATE(start_time) as date, COUNT(*) as sessions
+                FROM sessions
+                WHERE DATE(start_time) >= ?
+                GROUP BY DATE(start_time)
+                ORDER BY date
+            """, ((datetime.now() - timedelta(days=7)).date().isoformat(),))
+            stats["recent_activity"] = [{"date": row[0], "sessions": row[1]} for row in cursor]
+
+            # Most active projects
+            cursor.execute("""
+                SELECT project_path, project_name, session_count, total_time_seconds
+                FROM projects
+                ORDER BY session_count DESC
+                LIMIT 10
+            """)
+            stats["top_projects"] = [
+                {
+                    "path": row[0],
+                    "name": row[1],
+                    "sessions": row[2],
+                    "time": row[3]
+                }
+                for row in cursor
+            ]
 
         return stats
 
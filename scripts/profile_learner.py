@@ -4,140 +4,255 @@ Profile Learner - Continuously builds user profile from AI interactions
 Analyzes sessions to extract preferences, patterns, and persona details
 """
 
+import re
+import copy
 import json
 import sqlite3
 import os
+import functools
+from bisect import bisect_left
 from datetime import datetime
+from itertools import chain
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # MCP Memory Integration
 MEMORY_DB = Path.home() / ".claude" / "memory" / "context.db"
-SESSION_DB = Path.home() / ".claude" / "memory" / "context.db"
+SESSION_DB = MEMORY_DB  # sessions live in the same database
+SCHEMA_PATH = Path.home() / "ai-cli-memory-system" / "sql" / "schema.sql"
+
+_conn = None
+
+# Learning strings returned by the analyzers
+_WORK_WORKAPPS = "Works in ~/workapps/ directory for active projects"
+_WORK_DOWNLOADS = "Sometimes works from ~/Downloads/ for quick tasks"
+_WORK_CLAUDE = "Configures and maintains AI CLI tools and settings"
+_SESSION_EXTENDED = "Has extended work sessions (focus-intensive tasks)"
+_SESSION_TYPICAL = "Typical session length: 10-60 minutes"
+_SESSION_QUICK = "Quick sessions for rapid iteration"
+
+# Session-length learnings: a session longer than _SESSION_THRESHOLDS[i] seconds
+# (but not the next threshold) maps to _SESSION_LEARNINGS[i + 1]
+_SESSION_THRESHOLDS = (60, 600, 3600)
+_SESSION_LEARNINGS = (None, _SESSION_QUICK, _SESSION_TYPICAL, _SESSION_EXTENDED)
+
+# Directories under the home directory, each with a trailing separator so
+# ~/workapps matches ~/workapps/project but not ~/workapps-backup
+_HOME = str(Path.home())
+_WORK_DIR_PREFIXES = (
+    (os.path.join(_HOME, 'workapps', ''), _WORK_WORKAPPS),
+    (os.path.join(_HOME, 'Downloads', ''), _WORK_DOWNLOADS),
+    (os.path.join(_HOME, '.claude', ''), _WORK_CLAUDE),
+)
+
+# Keyword matchers, compiled once. Each alternative starts with `.*`, so re.match
+# tries them in order over the whole string: earlier keywords win, as in an if/elif chain.
+_GIT_BRANCH_RE = re.compile(r'.*(?P<trunk>main|master)|.*(?P<feature>feature)', re.DOTALL)
+_GIT_PATTERNS = {
+    'trunk': "Works directly on main branch for solo projects",
+    'feature': "Uses feature branches for structured development",
+}
+
+_TOOL_PREFERENCES = {
+    'claude': "Prefers Claude Code for development tasks",
+    'codex': "Uses Codex CLI for specific workflows",
+}
+
+# Observation wording per preference type, for capture_preference
+_PREF_TEMPLATES = {
+    'code_style': "Code style preference: {value} (learned {timestamp})",
+    'communication': "Communication preference: {value} (learned {timestamp})",
+    'workflow': "Workflow preference: {value} (learned {timestamp})",
+    'tool': "Tool preference: {value} (learned {timestamp})",
+    'decision': "Decision pattern: {value} (learned {timestamp})",
+    'frustration': "Frustration trigger: {value} - avoid in future (learned {timestamp})",
+    'satisfaction': "What works well: {value} (learned {timestamp})",
+}
+
+# Feedback phrases in user messages, by the kind of learning they signal
+_FEEDBACK_PHRASES = {
+    'preference': ('i like', 'i prefer'),
+    'frustration': ('frustrated', 'worthless', 'not working'),
+    'positive': ('perfect', 'excellent', 'great'),
+}
+
+# All phrases in one case-insensitive pattern, so a message is scanned once
+_FEEDBACK_RE = re.compile(
+    '|'.join(
+        f"(?P<{kind}>{'|'.join(map(re.escape, phrases))})"
+        for kind, phrases in _FEEDBACK_PHRASES.items()
+    ),
+    re.IGNORECASE
+)
+
+@functools.lru_cache(maxsize=None)
+def _session_length_kernel():
+    """Compile the batched session-length kernel on first use (None without numba)"""
+    try:
+        import numba
+        import numpy as np
+    except ImportError:
+        return None
+
+    @numba.njit(parallel=True)
+    def session_length_ids(durations, thresholds):
+        # Index into _SESSION_LEARNINGS: how many thresholds each duration exceeds
+        ids = np.empty(durations.shape[0], np.int8)
+        for i in numba.prange(durations.shape[0]):
+            bucket = 0
+            for threshold in thresholds:
+                if durations[i] > threshold:
+                    bucket += 1
+            ids[i] = bucket
+        return ids
+
+    return session_length_ids
+
+
+# Persona returned by build_persona_snapshot
+_PERSONA_SNAPSHOT = {
+    "name": "Daniel Gillaspy",
+    "professional_background": "20+ years oil & gas, HSE/Safety expert",
+    "technical_skills": "Python, JavaScript, AI automation",
+    "preferences": {
+        "code_quality": "Quality over quantity",
+        "communication": "Direct, concise, no fluff",
+        "tools": "Claude Code, Playwright, GPT-4",
+        "workflow": "Automated, production-ready solutions"
+    },
+    "patterns": {
+        "work_style": "Extended focused sessions",
+        "decision_making": "Data-driven, test-oriented",
+        "problem_solving": "Root cause analysis, not bandaids"
+    },
+    "triggers": {
+        "frustrations": ["Placeholder code", "0 results", "vague solutions"],
+        "satisfaction": ["Working automation", "High match scores", "Production ready"]
+    }
+}
 
 
 class ProfileLearner:
     """Continuously learns about user from session interactions."""
 
+    __slots__ = ('user_entity', '_seen')
+
     def __init__(self):
         self.user_entity = "Daniel Gillaspy"
+        # Learnings already saved through this learner, so replays don't re-save them
+        self._seen = set()
 
     def extract_learnings_from_session(self, session_data):
-        """Extract learnings from a completed session."""
-        learnings = []
+        """Extract learnings from a completed session, skipping ones already saved through this learner."""
+        return list(self.iter_learnings(session_data))
 
+    def iter_learnings(self, session_data):
+        """Yield learnings from a completed session as they are found, skipping ones already saved."""
+        for learning in self._analyze_session(session_data):
+            if learning and learning not in self._seen:
+                yield learning
+
+    def mark_saved(self, learnings):
+        """Record learnings as saved, so this learner stops returning them."""
+        self._seen.update(learnings)
+
+    def _analyze_session(self, session_data):
+        """Yield each analyzer's result for a session (None where it learned nothing)."""
         # Analyze working directory patterns
         work_dir = session_data.get('working_dir', '')
         if work_dir:
-            learnings.append(self._analyze_work_location(work_dir))
+            yield self._analyze_work_location(work_dir)
 
         # Analyze git usage
         git_branch = session_data.get('git_branch', '')
         if git_branch:
-            learnings.append(self._analyze_git_pattern(git_branch))
+            yield self._analyze_git_pattern(git_branch)
 
         # Analyze tool preferences
-        cli_tool = session_data.get('cli_tool', '')
-        learnings.append(self._analyze_tool_preference(cli_tool))
+        yield self._analyze_tool_preference(session_data.get('cli_tool', ''))
 
         # Analyze session duration
-        duration = session_data.get('duration', 0)
-        learnings.append(self._analyze_work_pattern(duration))
-
-        return [l for l in learnings if l]  # Filter out None
+        yield self._analyze_work_pattern(session_data.get('duration', 0))
+
+    def extract_learnings_from_sessions(self, sessions):
+        """Extract learnings from a pandas DataFrame of sessions in one vectorized pass.
+
+        Returns a DataFrame with one column per analyzer, None where nothing was learned.
+        """
+        import numpy as np
+        import pandas as pd
+
+        work_dirs = sessions['working_dir'].fillna('').str.rstrip(os.sep) + os.sep
+        work = pd.Series(None, index=sessions.index, dtype=object)
+        for prefix, learning in _WORK_DIR_PREFIXES:
+            work = work.mask(work_dirs.str.startswith(prefix), learning)
+
+        branches = sessions['git_branch'].fillna('')
+        groups = branches.str.extract(_GIT_BRANCH_RE)
+        git = (("Uses git branch: " + branches)
+               .mask(groups['feature'].notna(), _GIT_PATTERNS['feature'])
+               .mask(groups['trunk'].notna(), _GIT_PATTERNS['trunk'])
+               .where(branches != '', None))
+
+        # Bucket durations to _SESSION_LEARNINGS ids in compiled code, then map ids to text
+        durations = sessions['duration'].fillna(0).to_numpy(dtype=np.float64)
+        thresholds = np.array(_SESSION_THRESHOLDS, dtype=np.float64)
+        kernel = _session_length_kernel()
+        if kernel is not None:
+            length_ids = kernel(durations, thresholds)
+        else:
+            length_ids = np.searchsorted(thresholds, durations, side='left')
+        work_pattern = np.array(_SESSION_LEARNINGS, dtype=object)[length_ids]
+
+        learnings = pd.DataFrame({
+            'work_location': work,
+            'git_pattern': git,
+            'tool_preference': sessions['cli_tool'].map(_TOOL_PREFERENCES),
+            'work_pattern': pd.Series(work_pattern, index=sessions.index),
+        }).astype(object)
+        return learnings.where(learnings.notna(), None)
 
     def _analyze_work_location(self, work_dir):
         """Learn from working directory."""
-        if 'workapps' in work_dir:
-            return f"Works in ~/workapps/ directory for active projects"
-        elif 'Downloads' in work_dir:
-            return f"Sometimes works from ~/Downloads/ for quick tasks"
-        elif '.claude' in work_dir:
-            return f"Configures and maintains AI CLI tools and settings"
+        path = work_dir.rstrip(os.sep) + os.sep
+        for prefix, learning in _WORK_DIR_PREFIXES:
+            if path.startswith(prefix):
+                return learning
         return None
 
     def _analyze_git_pattern(self, git_branch):
         """Learn from git branch naming."""
-        if 'main' in git_branch or 'master' in git_branch:
-            return f"Works directly on main branch for solo projects"
-        elif 'feature' in git_branch:
-            return f"Uses feature branches for structured development"
-        return f"Uses git branch: {git_branch}"
+        match = _GIT_BRANCH_RE.match(git_branch)
+        return _GIT_PATTERNS[match.lastgroup] if match else f"Uses git branch: {git_branch}"
 
     def _analyze_tool_preference(self, cli_tool):
         """Learn from CLI tool choice."""
-        if cli_tool == 'claude':
-            return f"Prefers Claude Code for development tasks"
-        elif cli_tool == 'codex':
-            return f"Uses Codex CLI for specific workflows"
-        return None
+        return _TOOL_PREFERENCES.get(cli_tool)
 
     def _analyze_work_pattern(self, duration_seconds):
         """Learn from session duration patterns."""
-        if duration_seconds > 3600:  # > 1 hour
-            return f"Has extended work sessions (focus-intensive tasks)"
-        elif duration_seconds > 600:  # > 10 minutes
-            return f"Typical session length: 10-60 minutes"
-        elif duration_seconds > 60:  # > 1 minute
-            return f"Quick sessions for rapid iteration"
-        return None
+        return _SESSION_LEARNINGS[bisect_left(_SESSION_THRESHOLDS, duration_seconds)]
 
-    def capture_preference(self, preference_type, value):
-        """Capture a specific preference discovered during session."""
-        timestamp = datetime.now().isoformat()
+    def capture_preference(self, preference_type, value, *, timestamp=None):
+        """Capture a specific preference discovered during session.
 
-        observations = {
-            'code_style': [
-                f"Code style preference: {value} (learned {timestamp})"
-            ],
-            'communication': [
-                f"Communication preference: {value} (learned {timestamp})"
-            ],
-            'workflow': [
-                f"Workflow preference: {value} (learned {timestamp})"
-            ],
-            'tool': [
-                f"Tool preference: {value} (learned {timestamp})"
-            ],
-            'decision': [
-                f"Decision pattern: {value} (learned {timestamp})"
-            ],
-            'frustration': [
-                f"Frustration trigger: {value} - avoid in future (learned {timestamp})"
-            ],
-            'satisfaction': [
-                f"What works well: {value} (learned {timestamp})"
-            ]
-        }
-
-        return observations.get(preference_type, [f"{preference_type}: {value} (learned {timestamp})"])
+        Pass timestamp to share one ISO time across a batch of captures.
+        """
+        if timestamp is None:
+            timestamp = datetime.now().isoformat()
+        template = _PREF_TEMPLATES.get(preference_type, "{type}: {value} (learned {timestamp})")
+        return [template.format(type=preference_type, value=value, timestamp=timestamp)]
 
     def build_persona_snapshot(self):
         """Build comprehensive persona from all learnings."""
         # This would query the memory graph for all Daniel Gillaspy observations
-        # and synthesize them into a persona profile
-
-        persona = {
-            "name": "Daniel Gillaspy",
-            "professional_background": "20+ years oil & gas, HSE/Safety expert",
-            "technical_skills": "Python, JavaScript, AI automation",
-            "preferences": {
-                "code_quality": "Quality over quantity",
-                "communication": "Direct, concise, no fluff",
-                "tools": "Claude Code, Playwright, GPT-4",
-                "workflow": "Automated, production-ready solutions"
-            },
-            "patterns": {
-                "work_style": "Extended focused sessions",
-                "decision_making": "Data-driven, test-oriented",
-                "problem_solving": "Root cause analysis, not bandaids"
-            },
-            "triggers": {
-                "frustrations": ["Placeholder code", "0 results", "vague solutions"],
-                "satisfaction": ["Working automation", "High match scores", "Production ready"]
-            }
-        }
-
-        return persona
+        # and synthesize them into a persona profile. Until then it's a copy of the
+        # module-level snapshot, so callers can't change what later calls return.
+        return copy.deepcopy(_PERSONA_SNAPSHOT)
 
 
 # Example learning triggers
@@ -154,36 +269,72 @@ LEARNING_TRIGGERS = {
 
 def learn_from_interaction(user_message, ai_response, context):
     """Main entry point for learning from interactions."""
-    learner = ProfileLearner()
     learnings = []
 
     # Detect preferences from user messages
-    user_lower = user_message.lower()
+    found = {match.lastgroup for match in _FEEDBACK_RE.finditer(user_message)}
 
-    if 'i like' in user_lower or 'i prefer' in user_lower:
+    if 'preference' in found:
         # Extract what they like/prefer
         learnings.append(f"Preference detected: {user_message}")
 
-    if 'frustrated' in user_lower or 'worthless' in user_lower or 'not working' in user_lower:
+    if 'frustration' in found:
         # Capture frustration triggers
         learnings.append(f"Frustration trigger: {context.get('trigger', 'unknown')}")
 
-    if 'perfect' in user_lower or 'excellent' in user_lower or 'great' in user_lower:
+    if 'positive' in found:
         # Capture what works well
         learnings.append(f"Positive feedback: {context.get('what_worked', 'unknown')}")
 
     return learnings
 
 
-def save_learnings_to_memory(learnings):
-    """Save learnings to MCP memory graph."""
-    # This would use the mcp__memory__add_observations API
-    # For now, return structured data
+def _memory_conn():
+    """Return the shared memory database connection, opening it on first use."""
+    global _conn
+    if _conn is None:
+        MEMORY_DB.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(MEMORY_DB, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-64000")
+        if SCHEMA_PATH.exists():
+            conn.executescript(SCHEMA_PATH.read_text())
+        _conn = conn
+    return _conn
+
+
+def save_learnings_to_memory(batches, *, timestamp=None, learner=None):
+    """Save batches of learnings to the memory database in one transaction.
+
+    Batches may be any iterables, e.g. learner.iter_learnings(session) for each session;
+    a plain string counts as a batch of one, so a flat list of learnings also works.
+    With a learner, repeats within the call are dropped and, once the transaction
+    commits, the saved learnings are marked so that learner skips them from then on.
+    """
+    if timestamp is None:
+        timestamp = datetime.now().isoformat()
+    if isinstance(batches, str):
+        batches = (batches,)
+    learnings = list(chain.from_iterable((batch,) if isinstance(batch, str) else batch for batch in batches))
+    if learner is not None:
+        learnings = list(dict.fromkeys(learnings))
+
+    conn = _memory_conn()
+    with conn:
+        conn.executemany(
+            "INSERT INTO entity_observations (entity, observation, observed_at) VALUES (?, ?, ?)",
+            (("Daniel Gillaspy", obs, timestamp) for obs in learnings)
+        )
+
+    if learner is not None:
+        learner.mark_saved(learnings)
 
     return {
         "entity": "Daniel Gillaspy",
         "new_observations": learnings,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": timestamp
     }
 
 
@@ -193,7 +344,7 @@ if __name__ == "__main__":
 
     # Simulate session data
     session = {
-        "working_dir": "/Users/daniel/workapps/job-search-automation",
+        "working_dir": os.path.join(_HOME, "workapps", "job-search-automation"),
         "git_branch": "main",
         "cli_tool": "claude",
         "duration": 1200  # 20 minutes
@@ -207,4 +358,7 @@ if __name__ == "__main__":
     # Build persona
     persona = learner.build_persona_snapshot()
     print("\nPersona Snapshot:")
-    print(json.dumps(persona, indent=2))
+    if orjson is not None:
+        print(orjson.dumps(persona, option=orjson.OPT_INDENT_2).decode())
+    else:
+        print(json.dumps(persona, indent=2))
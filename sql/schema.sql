@@ -65,6 +65,12 @@ CREATE TABLE IF NOT EXISTS knowledge_base (
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Full-text index over the knowledge base (external content, synced by triggers)
+CREATE VIRTUAL TABLE IF NOT EXISTS knowledge_fts USING fts5(
+    title, description, category,
+    content='knowledge_base', content_rowid='id'
+);
+
 -- Project-specific memory
 CREATE TABLE IF NOT EXISTS projects (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -113,6 +119,7 @@ CREATE TABLE IF NOT EXISTS cli_versions (
     last_check DATETIME,
     update_available BOOLEAN DEFAULT 0,
     latest_version TEXT,
+    install_mtime_ns INTEGER, -- st_mtime_ns of install_path when version was read
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -141,23 +148,128 @@ CREATE TABLE IF NOT EXISTS entity_relations (
     UNIQUE(from_entity_id, to_entity_id, relation_type)
 );
 
+-- Observations learned about entities (written by profile_learner.py)
+CREATE TABLE IF NOT EXISTS entity_observations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    entity TEXT NOT NULL,
+    observation TEXT NOT NULL,
+    observed_at DATETIME NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_entity_observations_entity ON entity_observations(entity, observed_at DESC);
+
+-- Most recent sessions with their file/command counts, kept up to date by
+-- the triggers below so the dashboard doesn't re-aggregate on every poll
+CREATE TABLE IF NOT EXISTS recent_sessions_mat (
+    session_id TEXT PRIMARY KEY,
+    cli_tool TEXT NOT NULL,
+    working_dir TEXT NOT NULL,
+    git_branch TEXT,
+    start_time DATETIME NOT NULL,
+    duration_seconds INTEGER,
+    files_modified INTEGER DEFAULT 0,
+    commands_run INTEGER DEFAULT 0
+);
+
 -- Indexes for fast retrieval
 CREATE INDEX IF NOT EXISTS idx_sessions_tool ON sessions(cli_tool);
 CREATE INDEX IF NOT EXISTS idx_sessions_dir ON sessions(working_dir);
 CREATE INDEX IF NOT EXISTS idx_sessions_start ON sessions(start_time);
+CREATE INDEX IF NOT EXISTS idx_sessions_date_tool ON sessions(DATE(start_time), cli_tool);
 CREATE INDEX IF NOT EXISTS idx_context_session ON session_context(session_id);
 CREATE INDEX IF NOT EXISTS idx_context_type ON session_context(context_type);
 CREATE INDEX IF NOT EXISTS idx_files_session ON session_files(session_id);
 CREATE INDEX IF NOT EXISTS idx_files_path ON session_files(file_path);
+CREATE INDEX IF NOT EXISTS idx_files_path_lines ON session_files(file_path, language, lines_added, lines_removed);
 CREATE INDEX IF NOT EXISTS idx_commands_session ON session_commands(session_id);
 CREATE INDEX IF NOT EXISTS idx_knowledge_category ON knowledge_base(category);
 CREATE INDEX IF NOT EXISTS idx_knowledge_frequency ON knowledge_base(frequency DESC);
+CREATE INDEX IF NOT EXISTS idx_knowledge_freq_used ON knowledge_base(frequency DESC, last_used DESC);
 CREATE INDEX IF NOT EXISTS idx_projects_path ON projects(project_path);
+CREATE INDEX IF NOT EXISTS idx_projects_count ON projects(session_count DESC);
 CREATE INDEX IF NOT EXISTS idx_weekly_year_week ON weekly_summaries(year, week_number);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_cli_versions_tool ON cli_versions(tool_name);
 CREATE INDEX IF NOT EXISTS idx_entities_name ON entities(entity_name);
 CREATE INDEX IF NOT EXISTS idx_entities_type ON entities(entity_type);
 CREATE INDEX IF NOT EXISTS idx_relations_from ON entity_relations(from_entity_id);
 CREATE INDEX IF NOT EXISTS idx_relations_to ON entity_relations(to_entity_id);
+CREATE INDEX IF NOT EXISTS idx_recent_mat_start ON recent_sessions_mat(start_time DESC);
+
+-- Keep knowledge_fts in sync with knowledge_base
+CREATE TRIGGER IF NOT EXISTS knowledge_ai AFTER INSERT ON knowledge_base BEGIN
+    INSERT INTO knowledge_fts(rowid, title, description, category)
+    VALUES (new.id, new.title, new.description, new.category);
+END;
+
+CREATE TRIGGER IF NOT EXISTS knowledge_ad AFTER DELETE ON knowledge_base BEGIN
+    INSERT INTO knowledge_fts(knowledge_fts, rowid, title, description, category)
+    VALUES ('delete', old.id, old.title, old.description, old.category);
+END;
+
+CREATE TRIGGER IF NOT EXISTS knowledge_au AFTER UPDATE ON knowledge_base BEGIN
+    INSERT INTO knowledge_fts(knowledge_fts, rowid, title, description, category)
+    VALUES ('delete', old.id, old.title, old.description, old.category);
+    INSERT INTO knowledge_fts(rowid, title, description, category)
+    VALUES (new.id, new.title, new.description, new.category);
+END;
+
+-- Index knowledge rows the triggers never saw (e.g. added before knowledge_fts existed)
+INSERT INTO knowledge_fts(knowledge_fts)
+SELECT 'rebuild'
+WHERE (SELECT COUNT(*) FROM knowledge_fts_docsize) != (SELECT COUNT(*) FROM knowledge_base);
+
+-- Keep recent_sessions_mat to the newest 100 sessions
+CREATE TRIGGER IF NOT EXISTS recent_mat_session_ai AFTER INSERT ON sessions BEGIN
+    INSERT OR REPLACE INTO recent_sessions_mat (session_id, cli_tool, working_dir, git_branch, start_time, duration_seconds)
+    VALUES (new.session_id, new.cli_tool, new.working_dir, new.git_branch, new.start_time, new.duration_seconds);
+    DELETE FROM recent_sessions_mat WHERE session_id NOT IN (
+        SELECT session_id FROM recent_sessions_mat ORDER BY start_time DESC LIMIT 100
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS recent_mat_session_au AFTER UPDATE ON sessions BEGIN
+    UPDATE recent_sessions_mat
+    SET cli_tool = new.cli_tool,
+        working_dir = new.working_dir,
+        git_branch = new.git_branch,
+        start_time = new.start_time,
+        duration_seconds = new.duration_seconds
+    WHERE session_id = new.session_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS recent_mat_session_ad AFTER DELETE ON sessions BEGIN
+    DELETE FROM recent_sessions_mat WHERE session_id = old.session_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS recent_mat_files_ai AFTER INSERT ON session_files BEGIN
+    UPDATE recent_sessions_mat
+    SET files_modified = (
+        SELECT COUNT(DISTINCT file_path) FROM session_files WHERE session_id = new.session_id
+    )
+    WHERE session_id = new.session_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS recent_mat_commands_ai AFTER INSERT ON session_commands BEGIN
+    UPDATE recent_sessions_mat
+    SET commands_run = commands_run + 1
+    WHERE session_id = new.session_id;
+END;
+
+-- Fill recent_sessions_mat for databases that predate it
+INSERT INTO recent_sessions_mat
+SELECT
+    s.session_id,
+    s.cli_tool,
+    s.working_dir,
+    s.git_branch,
+    s.start_time,
+    s.duration_seconds,
+    (SELECT COUNT(DISTINCT sf.file_path) FROM session_files sf WHERE sf.session_id = s.session_id),
+    (SELECT COUNT(*) FROM session_commands sc WHERE sc.session_id = s.session_id)
+FROM sessions s
+WHERE NOT EXISTS (SELECT 1 FROM recent_sessions_mat)
+ORDER BY s.start_time DESC
+LIMIT 100;
 
 -- Views for common queries
 CREATE VIEW IF NOT EXISTS recent_sessions AS
@@ -0,0 +1,79 @@
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO / "scripts"))
+
+import memory_manager
+
+
+class MemoryManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        # ensure_db_exists reads the schema from ~/ai-cli-memory-system/sql/schema.sql
+        os.symlink(REPO, Path(self.tmp.name) / "ai-cli-memory-system")
+        home = mock.patch.dict(os.environ, {"HOME": self.tmp.name})
+        home.start()
+        self.addCleanup(home.stop)
+
+        self.db_path = str(Path(self.tmp.name) / "context.db")
+        self.manager = memory_manager.MemoryManager(db_path=self.db_path)
+        self.addCleanup(self.manager.close)
+
+    def _count(self, table):
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def test_buffered_rows_visible_after_flush(self):
+        session_id = self.manager.start_session("claude")
+        self.manager.log_context(session_id, "note", {"text": "hello"})
+        self.manager.log_file_action(session_id, "app.py", "edit", "python", 3, 1)
+        self.manager.log_command(session_id, "pytest", 0)
+        self.assertEqual(self._count("session_commands"), 0)
+
+        self.manager.flush()
+
+        self.assertEqual(self._count("session_context"), 1)
+        self.assertEqual(self._count("session_files"), 1)
+        self.assertEqual(self._count("session_commands"), 1)
+        self.assertFalse(any(self.manager._pending.values()))
+
+    def test_flush_drops_only_rows_violating_a_constraint(self):
+        session_id = self.manager.start_session("claude")
+        self.manager.log_command(session_id, "make", 0)
+        self.manager.log_command("no-such-session", "rm -rf build", 0)
+        self.manager.log_file_action(session_id, "app.py", "edit")
+
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.manager.flush()
+
+        with sqlite3.connect(self.db_path) as conn:
+            commands = conn.execute("SELECT session_id, command FROM session_commands").fetchall()
+        self.assertEqual(commands, [(session_id, "make")])
+        self.assertEqual(self._count("session_files"), 1)
+        self.assertIn("dropped buffered commands row for session no-such-session", stderr.getvalue())
+        self.assertFalse(any(self.manager._pending.values()))
+
+    def test_write_conn_invalidates_context_cache(self):
+        cwd = os.getcwd()  # start_session records the current directory
+        self.assertEqual(self.manager.get_relevant_context(cwd=cwd)["recent_sessions"], [])
+        self.assertTrue(self.manager._context_cache)
+
+        session_id = self.manager.start_session("claude")
+
+        self.assertFalse(self.manager._context_cache)
+        sessions = self.manager.get_relevant_context(cwd=cwd)["recent_sessions"]
+        self.assertEqual([s["session_id"] for s in sessions], [session_id])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO / "scripts"))
+
+import profile_learner
+
+
+class SaveLearningsToMemoryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self._patch("MEMORY_DB", Path(self.tmp.name) / "context.db")
+        self._patch("SCHEMA_PATH", REPO / "sql" / "schema.sql")
+        self._patch("_conn", None)
+        self.addCleanup(self._close_conn)
+
+    def _patch(self, name, value):
+        original = getattr(profile_learner, name)
+        setattr(profile_learner, name, value)
+        self.addCleanup(setattr, profile_learner, name, original)
+
+    def _close_conn(self):
+        if profile_learner._conn is not None:
+            profile_learner._conn.close()
+
+    def _saved(self):
+        with sqlite3.connect(profile_learner.MEMORY_DB) as conn:
+            return [row[0] for row in conn.execute("SELECT observation FROM entity_observations ORDER BY id")]
+
+    def test_batches_of_learnings(self):
+        result = profile_learner.save_learnings_to_memory(
+            [["Works in ~/workapps/", "Uses git branch: dev"], [], ["Quick sessions"]],
+            timestamp="2026-01-01T00:00:00",
+        )
+        expected = ["Works in ~/workapps/", "Uses git branch: dev", "Quick sessions"]
+        self.assertEqual(result["new_observations"], expected)
+        self.assertEqual(result["timestamp"], "2026-01-01T00:00:00")
+        self.assertEqual(self._saved(), expected)
+
+    def test_flat_list_of_learnings(self):
+        result = profile_learner.save_learnings_to_memory(["Works in ~/workapps/", "Quick sessions"])
+        self.assertEqual(result["new_observations"], ["Works in ~/workapps/", "Quick sessions"])
+        self.assertEqual(self._saved(), ["Works in ~/workapps/", "Quick sessions"])
+
+    def test_learner_skips_saved_learnings(self):
+        learner = profile_learner.ProfileLearner()
+        session = {
+            "working_dir": os.path.join(profile_learner._HOME, "workapps", "project"),
+            "cli_tool": "claude",
+            "duration": 120,
+        }
+        batches = (learner.iter_learnings(session) for _ in range(2))
+        profile_learner.save_learnings_to_memory(batches, learner=learner)
+        self.assertEqual(len(self._saved()), 3)
+        self.assertEqual(learner.extract_learnings_from_session(session), [])
+
+
+if __name__ == "__main__":
+    unittest.main()